@@ -0,0 +1,94 @@
+import random
+
+from src.data.schema import (
+    COLLECTION_METHODS, DISPOSAL_METHODS, FACILITY_TYPES, TRANSPORTATION_METHODS, WASTE_CATEGORIES,
+)
+
+CITIES = (
+    "Manila", "Quezon City", "Caloocan", "Pasig", "Taguig", "Makati", "Cebu City", "Davao City",
+    "Zamboanga City", "Cagayan de Oro", "Iloilo City", "Bacolod", "General Santos", "Baguio",
+    "Antipolo", "Batangas City", "Legazpi", "Tacloban", "Puerto Princesa", "Dumaguete",
+)
+
+FREQUENCIES = ("Daily", "Twice a week", "Weekly", "Every two weeks", "Monthly")
+
+OPERATING_HOURS = ("6:00 AM - 6:00 PM", "7:00 AM - 5:00 PM", "8:00 AM - 5:00 PM", "24 hours")
+
+STREETS = ("Rizal Street", "Mabini Avenue", "Bonifacio Road", "Luna Street", "Quezon Boulevard", "National Highway")
+
+NOTES = (
+    "Collected on schedule.", "Needs additional bins.", "Segregation compliance is low.",
+    "Volume increases during the rainy season.", "Pilot program for the barangay.",
+    "Reported by the city environment office.",
+)
+
+
+def pick_options(rng, options, low=1, high=3):
+    # Pick a few options in form order, as the listboxes produce them
+    return [options[index] for index in sorted(rng.sample(range(len(options)), rng.randint(low, high)))]
+
+
+def quantity(rng, scale):
+    # Skewed like real volumes: many small values and a long tail
+    return f"{rng.lognormvariate(0, 1) * scale:.2f}"
+
+
+def waste_profile(rng, number):
+    return {
+        "ID": f"{number:08x}",
+        "City": rng.choice(CITIES),
+        "Category": pick_options(rng, WASTE_CATEGORIES),
+        "Quantity": quantity(rng, 10),
+        "Notes": rng.choice(NOTES),
+    }
+
+
+def protocol(rng, number):
+    return {
+        "ID": f"{number:08x}",
+        "City": rng.choice(CITIES),
+        "Area": quantity(rng, 500),
+        "Frequency": rng.choice(FREQUENCIES),
+        "Method": pick_options(rng, COLLECTION_METHODS, 1, 2),
+        "Transportation": pick_options(rng, TRANSPORTATION_METHODS, 1, 3),
+        "Notes": rng.choice(NOTES),
+    }
+
+
+def facility(rng, number):
+    city = rng.choice(CITIES)
+    facility_type = rng.choice(FACILITY_TYPES)
+    return {
+        "ID": f"{number:08x}",
+        "Facility Name": f"{city} {facility_type} {number}",
+        "Area": quantity(rng, 2000),
+        "Operating Hours": rng.choice(OPERATING_HOURS),
+        "Address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {city}",
+        "Facility Type": facility_type,
+        "Disposal Methods": pick_options(rng, DISPOSAL_METHODS, 1, 4),
+        "Notes": rng.choice(NOTES),
+    }
+
+
+GENERATORS = {
+    "waste_profiles": waste_profile,
+    "protocols": protocol,
+    "facilities": facility,
+}
+
+
+def generate(record_type, count, seed=0, start=0):
+    """
+    Yield ``count`` synthetic records of a record type, using the option
+    lists of the forms. The same seed always gives the same records, and
+    IDs are numbered from ``start`` so they never collide.
+    """
+    make_record = GENERATORS[record_type]
+    rng = random.Random(f"{record_type}-{seed}-{start}")
+    for number in range(start, start + count):
+        yield make_record(rng, number)
+
+
+def form_fields(record):
+    # The fields a form submits for a record: everything but the ID
+    return {field: value for field, value in record.items() if field != "ID"}
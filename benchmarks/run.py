@@ -0,0 +1,209 @@
+"""
+Headless throughput benchmarks for the three record types.
+
+Run from the repository root:
+
+    python -m benchmarks.run --sizes 1k 10k 100k
+
+Every run is saved to ``benchmarks/results`` and compared with the
+previous saved run, so a drop in throughput between versions stands out.
+Results depend on the machine, so they stay local and are not committed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generators import GENERATORS, form_fields, generate
+from src.data.formats import read_records, write_records
+from src.data.reports import aggregate
+from src.data.repositories import REPOSITORIES
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SIZES = ("1k", "10k", "100k")
+
+# Edits timed per case; editing every row of a 10M-row file would take hours
+DEFAULT_EDITS = 1000
+
+# Throughput drops larger than this fraction are flagged
+REGRESSION_THRESHOLD = 0.10
+
+_SIZE_SUFFIXES = {"k": 1000, "m": 1000000}
+
+
+def parse_size(text):
+    """
+    Parse a row count such as ``5000``, ``10k`` or ``10m``.
+    """
+    text = text.strip().lower()
+    multiplier = _SIZE_SUFFIXES.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+
+
+def timed(results, name, rows, action):
+    # Run action once and store its duration and throughput under name
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    results[name] = {
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds) if seconds > 0 else None,
+    }
+
+
+def run_case(record_type, size, edits, directory):
+    """
+    Benchmark one record type at one size and return the results per
+    operation: write the generated JSON file, load it, insert, update and
+    delete ``edits`` records through the repository, export JSON and a
+    snapshot, close the file (folding in the journal) and aggregate a
+    report.
+    """
+    repository_class = REPOSITORIES[record_type]
+    schema = repository_class.record_type
+    path = os.path.join(directory, f"{record_type}-{size}.json")
+    results = {}
+
+    timed(results, "write", size, lambda: write_records(path, generate(record_type, size), schema))
+
+    repository = repository_class()
+    timed(results, "load", size, lambda: repository.load(path))
+
+    new_rows = [form_fields(record) for record in generate(record_type, edits, seed=1, start=size)]
+    timed(results, "insert", edits, lambda: [repository.add(fields) for fields in new_rows])
+
+    edited_ids = [f"{number:08x}" for number in random.Random(size).sample(range(size), min(edits, size))]
+    changes = [form_fields(record) for record in generate(record_type, len(edited_ids), seed=2)]
+    timed(results, "update", len(edited_ids),
+          lambda: [repository.update(record_id, fields) for record_id, fields in zip(edited_ids, changes)])
+    timed(results, "delete", len(edited_ids), lambda: [repository.delete(record_id) for record_id in edited_ids])
+
+    rows = len(repository.records)
+    timed(results, "export_json", rows, lambda: repository.export(os.path.join(directory, "export.json")))
+    timed(results, "export_snapshot", rows, lambda: repository.export(os.path.join(directory, "export.sdgs")))
+    timed(results, "close", rows, repository.close)
+
+    timed(results, "report", rows, lambda: aggregate(read_records(path, schema), schema))
+    return results
+
+
+def run(record_types, sizes, edits):
+    results = {}
+    for record_type in record_types:
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix="sdgpy-bench-") as directory:
+                print(f"{record_type} x {size:,} ...", file=sys.stderr)
+                results.setdefault(record_type, {})[str(size)] = run_case(record_type, size, edits, directory)
+    return results
+
+
+def _git(*args):
+    try:
+        completed = subprocess.run(["git", *args], capture_output=True, text=True, cwd=os.path.dirname(RESULTS_DIR))
+    except OSError:
+        return None
+    return completed.stdout if completed.returncode == 0 else None
+
+
+def git_commit():
+    output = _git("rev-parse", "--short", "HEAD")
+    if not output:
+        return None
+    return output.strip() or None
+
+
+def git_dirty():
+    """
+    Return whether tracked files differ from the commit, i.e. whether the
+    run measured code the commit does not contain, or None outside git.
+    """
+    output = _git("status", "--porcelain", "--untracked-files=no")
+    return None if output is None else bool(output.strip())
+
+
+def latest_results(exclude=None):
+    """
+    Return the most recent saved run, or None if there is none.
+    """
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    names = sorted(name for name in os.listdir(RESULTS_DIR) if name.endswith(".json") and name != exclude)
+    if not names:
+        return None
+    with open(os.path.join(RESULTS_DIR, names[-1])) as results_file:
+        return json.load(results_file)
+
+
+def save_results(run_data):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = f"{run_data['date'].replace(':', '').replace('-', '')}-{run_data['commit'] or 'unknown'}"
+    if run_data["dirty"]:
+        name += "-dirty"
+    name += ".json"
+    path = os.path.join(RESULTS_DIR, name)
+    with open(path, "w") as results_file:
+        json.dump(run_data, results_file, indent=4)
+    return path
+
+
+def format_table(current, previous=None):
+    """
+    Format the throughput of every operation, with the change against a
+    previous run where it measured the same case.
+    """
+    lines = [f"{'record type':<16}{'rows':>12}  {'operation':<17}{'rows/s':>14}  change"]
+    baseline = previous["results"] if previous else {}
+    for record_type, sizes in current["results"].items():
+        for size, operations in sizes.items():
+            for operation, result in operations.items():
+                speed = result["rows_per_second"]
+                change = ""
+                old = baseline.get(record_type, {}).get(size, {}).get(operation, {}).get("rows_per_second")
+                if speed and old:
+                    ratio = speed / old - 1
+                    change = f"{ratio:+.1%}" + ("  REGRESSION" if ratio < -REGRESSION_THRESHOLD else "")
+                speed_text = f"{speed:,}" if speed else "-"
+                lines.append(f"{record_type:<16}{int(size):>12,}  {operation:<17}{speed_text:>14}  {change}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--types", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS),
+                        help="record types to benchmark (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[parse_size(size) for size in DEFAULT_SIZES],
+                        help="rows per generated file, e.g. 1k 100k 10m (default: 1k 10k 100k)")
+    parser.add_argument("--edits", type=int, default=DEFAULT_EDITS,
+                        help=f"inserts, updates and deletes timed per case (default: {DEFAULT_EDITS})")
+    parser.add_argument("--no-save", action="store_true", help="print the results without saving them")
+    args = parser.parse_args(argv)
+
+    run_data = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "dirty": git_dirty(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "edits": args.edits,
+        "results": run(args.types, args.sizes, args.edits),
+    }
+
+    print(format_table(run_data, latest_results()))
+    if not args.no_save:
+        print(f"Results saved to {save_results(run_data)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
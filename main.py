@@ -1,8 +1,11 @@
 # main.py
 import tkinter as tk
 from src.app import WasteManagementApp
+from src.data.metrics import enable_from_environment
 
 if __name__ == "__main__":
+    # Record timings when SDGPY_METRICS names a dump file
+    enable_from_environment()
     root = tk.Tk()
     app = WasteManagementApp(root)
     root.mainloop()
@@ -3,10 +3,13 @@ from setuptools import setup, find_packages
 setup(
     name='sdgpy',
     version='0.1',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'tests', 'tests.*']),
     install_requires=[
         'tkinter',
     ],
+    extras_require={
+        'analytics': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'sdgpy = src.main:main',
@@ -1,12 +1,26 @@
+import sys
+import time
 import tkinter as tk
-import json
-from tkinter import PhotoImage, filedialog
+from tkinter import filedialog, messagebox
+from src.data.atomic import atomic_write
+from src.data.journal import JournalStore
+from src.data.metrics import count, enable_from_environment, file_size, registry, span
+from src.data.reports import aggregate, load_aggregates
+from src.data.storage import STORAGE_ERRORS
+from src.image_cache import load_image
 from src.manage_waste import ManageWasteDataFrame
 from src.waste_cat import WasteCatFrame
 from src.facility_waste import WasteFacilityFrame
 
+# How often the header checks whether the autosaves have caught up
+SAVE_STATUS_POLL_MS = 500
+
+# Time allowed from creating the app to the first idle moment of the event loop
+STARTUP_BUDGET_MS = 300
+
 class WasteManagementApp:
     def __init__(self, root):
+        started = time.perf_counter()
         self.root = root
         self.root.geometry('800x600')
         self.root.title('Waste Management System')
@@ -15,27 +29,75 @@ class WasteManagementApp:
 
         create_menu_bar(root, self)
 
-        # Define frames
-        self.frames = {
-            'Manage Waste Data': ManageWasteDataFrame(root),
-            'Waste C&T': WasteCatFrame(root),
-            'Waste Facilities': WasteFacilityFrame(root),
+        # Define frames; each one is built the first time it is shown
+        self.frame_classes = {
+            'Manage Waste Data': ManageWasteDataFrame,
+            'Waste C&T': WasteCatFrame,
+            'Waste Facilities': WasteFacilityFrame,
         }
+        self.frames = {}
+        self.current_frame = None
 
         # Set the default frame
-        self.current_frame = self.frames['Manage Waste Data']
+        self.show_frame('Manage Waste Data')
+
+        # Write pending edits, fold journal entries back into their files and close databases on exit
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.update_save_status()
+
+        # Measure the cold start once the first screen has been drawn
+        self.startup_ms = None
+        self.root.after_idle(self.check_startup_time, started)
+
+    def show_frame(self, frame_name):
+        frame = self.frames.get(frame_name)
+        if frame is None:
+            frame_class = self.frame_classes[frame_name]
+            with span(f"{frame_class.__name__}.__init__"):
+                frame = self.frames[frame_name] = frame_class(self.root)
+        if self.current_frame is not None:
+            self.current_frame.pack_forget()
+        self.current_frame = frame
         self.current_frame.pack(expand=True, fill="both")
 
+    def check_startup_time(self, started):
+        self.startup_ms = (time.perf_counter() - started) * 1000
+        registry.record("WasteManagementApp.startup", self.startup_ms / 1000)
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"Startup took {self.startup_ms:.0f} ms, over the {STARTUP_BUDGET_MS} ms budget.", file=sys.stderr)
+
+    def on_close(self):
+        for frame in self.frames.values():
+            try:
+                frame.close_storage()
+            except STORAGE_ERRORS as e:
+                if not messagebox.askyesno("Save Failed", f"Could not save the latest changes: {e}\n\nClose anyway and lose them?"):
+                    return
+        self.root.destroy()
+
+    def update_save_status(self):
+        # Autosaves run on worker threads, so poll their state from the Tk loop
+        repositories = [frame.repository for frame in self.frames.values()]
+        if any(repository.save_error for repository in repositories):
+            self.save_status.config(text='Save failed', fg='#ff8080')
+        elif any(repository.dirty for repository in repositories):
+            self.save_status.config(text='Unsaved changes', fg='#ffd966')
+        else:
+            self.save_status.config(text='All changes saved', fg='white')
+        self.root.after(SAVE_STATUS_POLL_MS, self.update_save_status)
+
     def generate_report(self):
         # Open a file dialog for selecting a JSON file
-        json_file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        json_file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("Snapshot files", "*.sdgs"), ("All files", "*.*")])
 
         # Check if a file was selected
         if json_file_path:
-            # Read the JSON data from the selected file
+            # Use the totals saved with the file, or aggregate the records in a single streaming pass
             try:
-                with open(json_file_path, 'r') as json_file:
-                    json_data = json.load(json_file)
+                with span("WasteManagementApp.aggregate"):
+                    report = load_aggregates(json_file_path) or aggregate(JournalStore(json_file_path, read_only=True).iter_records())
+                    count(rows=report.records, bytes=file_size(json_file_path))
             except Exception as e:
                 print(f"Error reading JSON file: {str(e)}")
                 return
@@ -45,70 +107,70 @@ class WasteManagementApp:
 
             # Check if a file was selected for saving
             if txt_file_path:
-                # Save the JSON data as a text file
+                # Save the report as a text file
                 try:
-                    with open(txt_file_path, 'w') as txt_file:
-                        json.dump(json_data, txt_file, indent=4)
-                    print(f"JSON data converted and saved to {txt_file_path} successfully.")
+                    with span("WasteManagementApp.write_report"), atomic_write(txt_file_path) as txt_file:
+                        txt_file.write(report.format())
+                    print(f"Report saved to {txt_file_path} successfully.")
                 except Exception as e:
-                    print(f"Error saving text file: {str(e)}")
+                    print(f"Error saving report: {str(e)}")
 
 def create_menu_bar(root, app):
+    # The side menu is built once and only shown or hidden by its geometry
     def toggle_menu():
-        def collapse_toggle_menu():
-            toggle_menu_fm.destroy()
-            toggle_btn.config(image=open_icon, command=toggle_menu)
-
-        toggle_menu_fm = tk.Frame(root, bg='#000080')
-
-        def create_button(frame, text, y_position, icon_path, frame_name):
-            btn_icon = PhotoImage(file=icon_path)
-            btn = tk.Button(frame, text=text, compound=tk.LEFT,
-                            image=btn_icon, font=('Calibri', 12), bd=0,
-                            bg='#000080', fg='white', anchor="w",
-                            padx=10, pady=10,
-                            activebackground='#000080', activeforeground='white',
-                            command=lambda fn=frame_name: switch_frame(fn))
-            btn.image = btn_icon
-            btn.place(x=20, y=y_position)
-
-            if text == 'Generate Reports':
-                btn.config(command=app.generate_report)
-
-        def switch_frame(frame_name):
-            app.current_frame.pack_forget()
-            app.current_frame = app.frames[frame_name]
-            app.current_frame.pack(expand=True, fill="both")
-
-        create_button(toggle_menu_fm, 'Manage Waste Data', 20, 'assets/icons/folder-icon.png', 'Manage Waste Data')
-        create_button(toggle_menu_fm, 'Waste C&T', 80, 'assets/icons/waste-icon.png', 'Waste C&T')
-        create_button(toggle_menu_fm, 'Waste Facilities', 140, 'assets/icons/facilities-icon.png', 'Waste Facilities')
-        create_button(toggle_menu_fm, 'Generate Reports', 200, 'assets/icons/report-icon.png', 'Waste Reports')
-
-        window_height = root.winfo_height()
-        toggle_menu_fm.place(x=0, y=50, height=window_height, width=270)
+        toggle_menu_fm.place(x=0, y=50, relheight=1.0, height=-50, width=270)
+        # Keep the menu above frames built after it
+        toggle_menu_fm.lift()
         toggle_btn.config(image=close_icon, command=collapse_toggle_menu)
 
-    open_icon = PhotoImage(file='assets/icons/menu-icon.png')
-    close_icon = PhotoImage(file='assets/icons/close-icon.png')
+    def collapse_toggle_menu():
+        toggle_menu_fm.place_forget()
+        toggle_btn.config(image=open_icon, command=toggle_menu)
+
+    def switch_frame(frame_name):
+        app.show_frame(frame_name)
+        toggle_menu_fm.lift()
+
+    def create_button(frame, text, y_position, icon_path, command):
+        btn = tk.Button(frame, text=text, compound=tk.LEFT,
+                        image=load_image(icon_path), font=('Calibri', 12), bd=0,
+                        bg='#000080', fg='white', anchor="w",
+                        padx=10, pady=10,
+                        activebackground='#000080', activeforeground='white',
+                        command=command)
+        btn.place(x=20, y=y_position)
+
+    toggle_menu_fm = tk.Frame(root, bg='#000080')
+
+    create_button(toggle_menu_fm, 'Manage Waste Data', 20, 'assets/icons/folder-icon.png', lambda: switch_frame('Manage Waste Data'))
+    create_button(toggle_menu_fm, 'Waste C&T', 80, 'assets/icons/waste-icon.png', lambda: switch_frame('Waste C&T'))
+    create_button(toggle_menu_fm, 'Waste Facilities', 140, 'assets/icons/facilities-icon.png', lambda: switch_frame('Waste Facilities'))
+    create_button(toggle_menu_fm, 'Generate Reports', 200, 'assets/icons/report-icon.png', app.generate_report)
+
+    open_icon = load_image('assets/icons/menu-icon.png')
+    close_icon = load_image('assets/icons/close-icon.png')
 
     head_frame = tk.Frame(root, bg='#000080', highlightbackground='white', highlightthickness=1)
 
     toggle_btn = tk.Button(head_frame, image=open_icon, bd=0, bg='#000080', command=toggle_menu)
     toggle_btn.place(x=10, y=10)
 
-    title_icon = PhotoImage(file='assets/icons/title-icon.png')
-
     title_lb = tk.Label(head_frame, text='Waste Management System', bg='#000080',
-                        fg='white', font=('Bold', 15), compound=tk.LEFT, image=title_icon, padx=10)
-    title_lb.image = title_icon
+                        fg='white', font=('Bold', 15), compound=tk.LEFT,
+                        image=load_image('assets/icons/title-icon.png'), padx=10)
     title_lb.place(relx=0.05, rely=0.5, anchor=tk.W)
 
+    # Saved/unsaved indicator, kept up to date by app.update_save_status
+    app.save_status = tk.Label(head_frame, text='All changes saved', bg='#000080',
+                               fg='white', font=('Calibri', 11))
+    app.save_status.place(relx=0.98, rely=0.5, anchor=tk.E)
+
     head_frame.pack(side=tk.TOP, fill=tk.X)
     head_frame.pack_propagate(False)
     head_frame.configure(height=50)
 
 if __name__ == "__main__":
+    enable_from_environment()
     root = tk.Tk()
     app = WasteManagementApp(root)
     root.mainloop()
@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+
+from src.data.metrics import count, span
+
+
+class BackgroundLoader:
+    """
+    Load records on a worker thread and hand them to the Tk main thread in
+    batches.
+
+    ``load_records`` runs on the worker thread and returns an iterable of
+    records. The worker groups them into batches of ``batch_size`` and puts
+    them on a queue; the main thread drains that queue from an ``after()``
+    callback, spending at most ``frame_budget_ms`` per tick so the window
+    keeps repainting while a large file loads.
+
+    ``progress`` is an optional callable returning the fraction of the
+    source read so far; without it the fraction is derived from the number
+    of records when ``load_records`` returns a sized collection.
+    """
+
+    def __init__(self, widget, load_records, on_batch, on_done, on_error,
+                 progress=None, batch_size=2000, poll_ms=16, frame_budget_ms=8):
+        self.widget = widget
+        self.load_records = load_records
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.on_error = on_error
+        self.progress = progress
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
+        self.frame_budget = frame_budget_ms / 1000
+
+        self.loaded = 0
+        self.total = None
+        self.fraction = None
+        self._queue = queue.Queue(maxsize=64)
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._after_id = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+        self._after_id = self.widget.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        """
+        Stop loading. No more batches are delivered after this returns.
+        """
+        self._cancelled.set()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def _worker(self):
+        try:
+            with span("BackgroundLoader.read"):
+                records = self.load_records()
+                if hasattr(records, "__len__"):
+                    self.total = len(records)
+
+                batch = []
+                for record in records:
+                    if self._cancelled.is_set():
+                        return
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        count(rows=len(batch))
+                        self._put(("batch", batch))
+                        batch = []
+                if batch:
+                    count(rows=len(batch))
+                    self._put(("batch", batch))
+            self._put(("done", None))
+        except Exception as e:
+            self._put(("error", e))
+
+    def _put(self, message):
+        # Block while the main thread catches up, but give up on cancel
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _poll(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.frame_budget
+
+        while time.perf_counter() < deadline:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "batch":
+                self.loaded += len(payload)
+                if self.progress is not None:
+                    self.fraction = self.progress()
+                elif self.total:
+                    self.fraction = self.loaded / self.total
+                try:
+                    self.on_batch(payload)
+                except Exception as e:
+                    self.cancel()
+                    self.on_error(e)
+                    return
+            elif kind == "done":
+                self.on_done()
+                return
+            else:
+                self.cancel()
+                self.on_error(payload)
+                return
+
+        if not self._cancelled.is_set():
+            self._after_id = self.widget.after(self.poll_ms, self._poll)
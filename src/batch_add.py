@@ -0,0 +1,81 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from src.data.formats import iter_csv, parse_table
+
+# Number of rejected rows listed in the summary message
+MAX_LISTED_ERRORS = 20
+
+
+class BatchAddDialog(tk.Toplevel):
+    """
+    Dialog that adds many records at once from a CSV file or a table pasted
+    from a spreadsheet.
+
+    All rows are validated together by the repository; the valid ones are
+    added in a single write and the rejected ones are listed in one summary.
+    ``on_added`` is called with the added records.
+    """
+
+    def __init__(self, master, repository, on_added):
+        super().__init__(master)
+        self.repository = repository
+        self.on_added = on_added
+
+        self.title("Batch Add")
+        self.transient(master)
+
+        # Instructions naming the expected columns
+        fields = ", ".join(repository.record_type.fields[1:])
+        instructions = ttk.Label(self, text=f"Paste rows with the columns: {fields}.\n"
+                                            "A header line with the field names is optional. "
+                                            "Separate multiple categories with commas.",
+                                 wraplength=500, justify="left")
+        instructions.grid(row=0, column=0, columnspan=3, padx=10, pady=10, sticky="w")
+
+        # Text box for the pasted table
+        self.table_entry = tk.Text(self, wrap=tk.NONE, height=15, width=80)
+        self.table_entry.grid(row=1, column=0, columnspan=3, padx=10, pady=5)
+
+        ttk.Button(self, text="Add Rows", command=self.add_pasted_rows).grid(row=2, column=0, pady=10)
+        ttk.Button(self, text="Load CSV...", command=self.add_csv_rows).grid(row=2, column=1, pady=10)
+        ttk.Button(self, text="Cancel", command=self.destroy).grid(row=2, column=2, pady=10)
+
+    def add_pasted_rows(self):
+        rows = parse_table(self.table_entry.get("1.0", tk.END), self.repository.record_type)
+        if not rows:
+            messagebox.showinfo("Information", "Please paste at least one row.", parent=self)
+            return
+        self.add_rows(rows)
+
+    def add_csv_rows(self):
+        csv_path = filedialog.askopenfilename(parent=self, filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if csv_path:
+            try:
+                rows = list(iter_csv(csv_path, self.repository.record_type))
+            except (OSError, UnicodeDecodeError) as e:
+                messagebox.showerror("Error", f"Error reading {csv_path}: {str(e)}", parent=self)
+                return
+            self.add_rows(rows)
+
+    def add_rows(self, rows):
+        try:
+            records, errors = self.repository.add_many(rows)
+        except Exception as e:
+            messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}", parent=self)
+            return
+        if records:
+            self.on_added(records)
+
+        # One summary for the whole batch
+        summary = f"{len(records)} of {len(rows)} rows added."
+        if records and self.repository.storage is None:
+            summary += " No file path available. Data added only to the table."
+        if errors:
+            listed = "\n".join(f"Row {number}: {message}" for number, message in errors[:MAX_LISTED_ERRORS])
+            summary += f"\n\n{len(errors)} rows were rejected:\n{listed}"
+            if len(errors) > MAX_LISTED_ERRORS:
+                summary += f"\n... and {len(errors) - MAX_LISTED_ERRORS} more."
+            messagebox.showwarning("Batch Add", summary, parent=self)
+        else:
+            messagebox.showinfo("Success", summary, parent=self)
+        self.destroy()
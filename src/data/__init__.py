@@ -0,0 +1,4 @@
+"""
+Headless storage and data-access helpers shared by the Tkinter frames.
+"""
+from src.data.journal import JournalStore
@@ -0,0 +1,282 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this module needs it
+    np = None
+
+from src.data.formats import read_records
+from src.data.snapshot import Snapshot, is_snapshot
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Analytics need NumPy. Install it with: pip install numpy")
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class ColumnTable:
+    """
+    Typed NumPy columns of one record type, for vectorized analytics.
+
+    The numeric field of the record type (Quantity or Area) becomes a
+    float64 array with NaN where the text is not a number. Category fields
+    become int32 code arrays next to the list of values the codes stand
+    for; category list fields are exploded into parallel arrays of row
+    numbers and codes. Every statistic is then a handful of NumPy calls
+    over whole columns.
+    """
+
+    def __init__(self, record_type, amounts, categories, lists, ids):
+        self.record_type = record_type
+        self.amount_field = record_type.fields_of_kind("numeric")[0]
+        self.amounts = amounts
+        self.categories = categories
+        self.lists = lists
+        self._ids = ids
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def from_records(cls, records, record_type):
+        """
+        Build the columns from an iterable of records in a single pass.
+        """
+        require_numpy()
+        amount_field = record_type.fields_of_kind("numeric")[0]
+        category_fields = record_type.fields_of_kind("category")
+        list_fields = record_type.fields_of_kind("category_list")
+
+        amounts = array("d")
+        ids = []
+        codes = {field: (array("i"), {}) for field in category_fields}
+        exploded = {field: (array("q"), array("i"), {}) for field in list_fields}
+
+        for row, record in enumerate(records):
+            ids.append(record.get("ID"))
+            amounts.append(_number(record.get(amount_field)))
+            for field, (column, dictionary) in codes.items():
+                column.append(dictionary.setdefault(record.get(field, ""), len(dictionary)))
+            for field, (rows, column, dictionary) in exploded.items():
+                for value in record.get(field) or ():
+                    rows.append(row)
+                    column.append(dictionary.setdefault(value, len(dictionary)))
+
+        categories = {field: (np.frombuffer(column, dtype=np.int32), list(dictionary))
+                      for field, (column, dictionary) in codes.items()}
+        lists = {field: (np.frombuffer(rows, dtype=np.int64), np.frombuffer(column, dtype=np.int32), list(dictionary))
+                 for field, (rows, column, dictionary) in exploded.items()}
+        return cls(record_type, np.frombuffer(amounts, dtype=np.float64), categories, lists, ids)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Build the columns straight from the buffers of an open ``Snapshot``,
+        without decoding any record except those kept as JSON.
+        """
+        require_numpy()
+        record_type = snapshot.record_type
+        amount_field = record_type.fields_of_kind("numeric")[0]
+        overflow = [(row, snapshot.record(row)) for row in snapshot.overflow_rows()]
+
+        # Copies, so the arrays outlive the mapping and overflow rows can be patched
+        amounts = np.array(snapshot.column(amount_field), dtype=np.float64)
+        categories = {}
+        for field in record_type.fields_of_kind("category"):
+            codes = np.array(snapshot.column(field), dtype=np.int32)
+            values = list(snapshot.dictionary(field))
+            categories[field] = (codes, values)
+
+        lists = {}
+        for field in record_type.fields_of_kind("category_list"):
+            values = list(snapshot.dictionary(field))
+            masks = snapshot.masks(field)
+            if masks is not None:
+                # Explode the bitmasks into row and code pairs, one bit at a time
+                masks = np.frombuffer(masks, dtype=np.uint64)
+                rows = [np.flatnonzero(masks & np.uint64(1 << code)) for code in range(len(values))]
+                codes = [np.full(len(found), code, dtype=np.int32) for code, found in enumerate(rows)]
+                lists[field] = (np.concatenate(rows or [np.empty(0, dtype=np.int64)]).astype(np.int64),
+                                np.concatenate(codes or [np.empty(0, dtype=np.int32)]), values)
+                continue
+            offsets = np.array(snapshot.offsets(field), dtype=np.int64)
+            rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+            lists[field] = (rows, np.array(snapshot.column(field), dtype=np.int32), values)
+
+        table = cls(record_type, amounts, categories, lists, lambda rows: [snapshot.record(row).get("ID") for row in rows])
+        table._patch(overflow)
+        return table
+
+    @classmethod
+    def from_file(cls, path, record_type):
+        """
+        Build the columns of a snapshot or any file ``read_records`` reads.
+        """
+        if is_snapshot(path):
+            with Snapshot(path) as snapshot:
+                table = cls.from_snapshot(snapshot)
+
+            # Decode IDs on demand by reopening the file
+            table._ids = lambda rows: _snapshot_ids(path, rows)
+            return table
+        return cls.from_records(read_records(path, record_type), record_type)
+
+    def group_sums(self, field):
+        """
+        Return the total amount per value of a category field, skipping
+        amounts that are not numbers.
+        """
+        codes, values, rows = self._codes(field)
+        weights = np.nan_to_num(self.amounts)[rows] if rows is not None else np.nan_to_num(self.amounts)
+        totals = np.bincount(codes, weights=weights, minlength=len(values))
+        counts = np.bincount(codes, minlength=len(values))
+        return {value: total for value, total, count in zip(values, totals.tolist(), counts.tolist()) if count}
+
+    def group_counts(self, field):
+        """
+        Return the number of records per value of a category field.
+        """
+        codes, values, _ = self._codes(field)
+        counts = np.bincount(codes, minlength=len(values))
+        return {value: count for value, count in zip(values, counts.tolist()) if count}
+
+    def masks(self, field):
+        """
+        Return one uint64 bitmask per row for a category list field, where
+        bit ``n`` stands for the ``n``-th value of the field.
+        """
+        rows, codes, values = self.lists[field]
+        if len(values) > 64:
+            raise ValueError(f"{field} has more than 64 values to fit in a bitmask")
+        masks = np.zeros(len(self), dtype=np.uint64)
+        np.bitwise_or.at(masks, rows, np.left_shift(np.uint64(1), codes.astype(np.uint64)))
+        return masks
+
+    def rows_with(self, field, values, match_all=True):
+        """
+        Return the rows of a category list field holding all of ``values``,
+        or any of them with ``match_all=False``, as one bitwise test over
+        the row bitmasks.
+        """
+        known = self.lists[field][2]
+        if match_all and any(value not in known for value in values):
+            return np.empty(0, dtype=np.int64)
+        wanted = np.uint64(0)
+        for value in values:
+            if value in known:
+                wanted |= np.uint64(1) << np.uint64(known.index(value))
+        masks = self.masks(field)
+        if match_all:
+            return np.flatnonzero((masks & wanted) == wanted)
+        return np.flatnonzero(masks & wanted)
+
+    def percentiles(self, percents=(25, 50, 75, 90, 99)):
+        """
+        Return the percentiles of the numeric amounts.
+        """
+        valid = self.amounts[~np.isnan(self.amounts)]
+        if not len(valid):
+            return {percent: None for percent in percents}
+        return dict(zip(percents, np.percentile(valid, percents).tolist()))
+
+    def ratios(self, field, denominators):
+        """
+        Divide the totals per value of ``field`` by ``denominators``, a
+        mapping such as population per City (per-capita figures) or the area
+        per City from another table (per-sq-m figures). Values without a
+        positive denominator are left out.
+        """
+        totals = self.group_sums(field)
+        return {value: totals[value] / denominator
+                for value, denominator in denominators.items()
+                if value in totals and denominator and denominator > 0}
+
+    def outliers(self, k=1.5):
+        """
+        Return the rows whose amount lies more than ``k`` interquartile
+        ranges outside the first or third quartile.
+        """
+        valid = ~np.isnan(self.amounts)
+        if not valid.any():
+            return np.empty(0, dtype=np.int64)
+        first, third = np.percentile(self.amounts[valid], (25, 75))
+        spread = k * (third - first)
+        with np.errstate(invalid="ignore"):
+            mask = valid & ((self.amounts < first - spread) | (self.amounts > third + spread))
+        return np.flatnonzero(mask)
+
+    def outlier_ids(self, k=1.5):
+        """
+        Return the IDs of the records found by ``outliers``.
+        """
+        return self.ids(self.outliers(k).tolist())
+
+    def ids(self, rows):
+        """
+        Return the record IDs of the given rows.
+        """
+        if callable(self._ids):
+            return self._ids(rows)
+        return [self._ids[row] for row in rows]
+
+    def summary(self):
+        """
+        Return count, sum, mean, standard deviation, min and max of the
+        numeric amounts.
+        """
+        valid = self.amounts[~np.isnan(self.amounts)]
+        if not len(valid):
+            return {"records": len(self), "numeric": 0}
+        return {
+            "records": len(self),
+            "numeric": int(len(valid)),
+            "sum": float(valid.sum()),
+            "mean": float(valid.mean()),
+            "std": float(valid.std()),
+            "min": float(valid.min()),
+            "max": float(valid.max()),
+        }
+
+    def _codes(self, field):
+        if field in self.categories:
+            codes, values = self.categories[field]
+            return codes, values, None
+        rows, codes, values = self.lists[field]
+        return codes, values, rows
+
+    def _patch(self, overflow):
+        # Put the values of the records kept as JSON into the column slots
+        extra = {field: ([], []) for field in self.lists}
+        for row, record in overflow:
+            self.amounts[row] = _number(record.get(self.amount_field))
+            for field, (codes, values) in self.categories.items():
+                value = record.get(field, "")
+                if value not in values:
+                    values.append(value)
+                codes[row] = values.index(value)
+            # Snapshot placeholders for these rows hold empty lists
+            for field, (rows, codes) in extra.items():
+                values = self.lists[field][2]
+                for value in record.get(field) or ():
+                    if value not in values:
+                        values.append(value)
+                    rows.append(row)
+                    codes.append(values.index(value))
+
+        for field, (rows, codes) in extra.items():
+            if rows:
+                old_rows, old_codes, values = self.lists[field]
+                self.lists[field] = (np.concatenate([old_rows, np.array(rows, dtype=np.int64)]),
+                                     np.concatenate([old_codes, np.array(codes, dtype=np.int32)]), values)
+
+
+def _snapshot_ids(path, rows):
+    with Snapshot(path) as snapshot:
+        return [snapshot.record(row).get("ID") for row in rows]
@@ -0,0 +1,99 @@
+import os
+import shutil
+from contextlib import contextmanager
+from uuid import uuid4
+
+# Large buffer so big rewrites reach the disk in few system calls
+WRITE_BUFFER = 1 << 20
+
+
+def backup_path(path, number):
+    return f"{path}.{number}.bak"
+
+
+class AtomicWriter:
+    """
+    Replaces a file in one step, so a crash never leaves it half written.
+
+    The new contents go to ``temp_path``, a uniquely named file in the same
+    directory. ``commit`` flushes it to disk with fsync and renames it over
+    ``path``, which readers see as a single switch from the old file to the
+    new one; ``discard`` drops it and leaves ``path`` untouched. With
+    ``backups`` set, the replaced file is kept as ``path.1.bak`` and older
+    copies move up to ``path.<backups>.bak``.
+
+    Used as a context manager it commits on success and discards on error.
+    """
+
+    def __init__(self, path, backups=0):
+        self.path = path
+        self.backups = backups
+        self.temp_path = f"{path}.{uuid4().hex[:8]}.tmp"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def commit(self):
+        """
+        Make the temp file durable and move it over the target file.
+        """
+        try:
+            # fsync through a fresh descriptor works whoever wrote the file
+            with open(self.temp_path, "r+b") as temp_file:
+                os.fsync(temp_file.fileno())
+            if self.backups > 0 and os.path.exists(self.path):
+                self._rotate_backups()
+            os.replace(self.temp_path, self.path)
+        except BaseException:
+            self.discard()
+            raise
+        _sync_directory(os.path.dirname(os.path.abspath(self.path)))
+
+    def discard(self):
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def _rotate_backups(self):
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(backup_path(self.path, number)):
+                os.replace(backup_path(self.path, number), backup_path(self.path, number + 1))
+
+        # A hard link keeps the old file without copying it; copy where links are unsupported
+        newest = backup_path(self.path, 1)
+        if os.path.exists(newest):
+            os.remove(newest)
+        try:
+            os.link(self.path, newest)
+        except OSError:
+            shutil.copy2(self.path, newest)
+
+
+@contextmanager
+def atomic_write(path, mode="w", backups=0, **kwargs):
+    """
+    Open a temp file for writing in place of ``path`` and atomically swap
+    it in once the block finishes without error. See ``AtomicWriter``.
+    """
+    with AtomicWriter(path, backups) as writer:
+        with open(writer.temp_path, mode, buffering=WRITE_BUFFER, **kwargs) as temp_file:
+            yield temp_file
+
+
+def _sync_directory(directory):
+    # Persist the rename itself; not every platform can fsync a directory
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
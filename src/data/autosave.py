@@ -0,0 +1,143 @@
+import threading
+
+# Seconds without a new edit before the pending edits are written
+AUTOSAVE_DELAY = 2.0
+
+# Number of pending edits that are written straight away
+AUTOSAVE_EDITS = 200
+
+
+class AutosaveStore:
+    """
+    Write-behind wrapper around a storage backend.
+
+    Adds, updates and deletes only queue the edit and mark the store dirty,
+    so the Tk callbacks return at once. The queue is written to the wrapped
+    backend on a background thread once no edit arrived for ``delay``
+    seconds or ``max_edits`` edits are waiting, with runs of adds coalesced
+    into a single ``add_many``. Reading, compacting and closing flush first,
+    so they always see every edit.
+
+    A failed write keeps the unwritten edits queued for the next flush and
+    is remembered in ``error`` until a flush succeeds.
+    """
+
+    def __init__(self, storage, delay=AUTOSAVE_DELAY, max_edits=AUTOSAVE_EDITS):
+        self.storage = storage
+        self.delay = delay
+        self.max_edits = max_edits
+        self.error = None
+
+        self._pending = []
+        self._writing = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        # Held while writing, so flushes from different threads keep the edit order
+        self._flush_lock = threading.Lock()
+
+    @property
+    def dirty(self):
+        """
+        Whether some edits have not reached the backend yet.
+        """
+        return bool(self._pending or self._writing)
+
+    def add(self, record):
+        self._queue(("add", record))
+
+    def add_many(self, records):
+        self._queue(*(("add", record) for record in records))
+
+    def update(self, record_id, fields):
+        self._queue(("update", record_id, fields))
+
+    def delete(self, record_id):
+        self._queue(("delete", record_id))
+
+    def flush(self):
+        """
+        Write every pending edit to the backend now.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._cancel_timer()
+                edits, self._pending = self._pending, []
+                self._writing = len(edits)
+            try:
+                written = self._write(edits)
+            finally:
+                with self._lock:
+                    self._writing = 0
+            if written < len(edits):
+                # Put the rest back in front of any edit queued meanwhile
+                with self._lock:
+                    self._pending[:0] = edits[written:]
+                raise self.error
+            self.error = None
+
+    def iter_records(self):
+        self.flush()
+        return self.storage.iter_records()
+
+    def load(self):
+        self.flush()
+        return self.storage.load()
+
+    def progress(self):
+        return self.storage.progress()
+
+    @property
+    def rekeyed(self):
+        return getattr(self.storage, "rekeyed", [])
+
+    def compact(self, wait=False):
+        self.flush()
+        self.storage.compact(wait)
+
+    def close(self):
+        self.flush()
+        self.storage.close()
+
+    def _queue(self, *edits):
+        with self._lock:
+            self._pending.extend(edits)
+            self._cancel_timer()
+            if len(self._pending) >= self.max_edits:
+                thread = threading.Thread(target=self._background_flush, daemon=True)
+            else:
+                thread = self._timer = threading.Timer(self.delay, self._background_flush)
+                thread.daemon = True
+        thread.start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            # Kept in self.error and retried with the next flush
+            pass
+
+    def _write(self, edits):
+        # Return how many edits were written; stop at the first failure
+        written = 0
+        try:
+            while written < len(edits):
+                if edits[written][0] == "add":
+                    end = written
+                    while end < len(edits) and edits[end][0] == "add":
+                        end += 1
+                    self.storage.add_many([edit[1] for edit in edits[written:end]])
+                    written = end
+                    continue
+                if edits[written][0] == "update":
+                    self.storage.update(edits[written][1], edits[written][2])
+                else:
+                    self.storage.delete(edits[written][1])
+                written += 1
+        except Exception as e:
+            self.error = e
+        return written
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import os
+
+from src.data.atomic import atomic_write
+from src.data.json_stream import write_json_array
+from src.data.snapshot import is_snapshot, write_snapshot
+from src.data.sqlite_store import SQLiteStore, is_sqlite
+from src.data.storage import open_storage
+
+CSV_EXTENSION = ".csv"
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Separator of category list values inside one CSV cell, as shown in the tables
+LIST_SEPARATOR = ", "
+
+
+def is_csv(path):
+    return path.lower().endswith(CSV_EXTENSION)
+
+
+def is_jsonl(path):
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+
+def read_records(path, record_type):
+    """
+    Stream the records of a CSV, JSON Lines, JSON, snapshot or SQLite file,
+    depending on its extension.
+    """
+    if is_csv(path):
+        return iter_csv(path, record_type)
+    if is_jsonl(path):
+        return iter_jsonl(path)
+    return _iter_storage(path, record_type)
+
+
+def write_records(path, records, record_type, backups=0):
+    """
+    Write ``records`` to a CSV, JSON Lines, JSON, snapshot or SQLite file,
+    depending on its extension, and return how many were written. An
+    existing file is replaced atomically, keeping ``backups`` copies of it;
+    a SQLite table is replaced in one transaction.
+    """
+    if is_csv(path):
+        return write_csv(path, records, record_type, backups)
+    if is_jsonl(path):
+        return write_jsonl(path, records, backups)
+    if is_snapshot(path):
+        return write_snapshot(path, records, record_type, backups)
+    if is_sqlite(path):
+        database = SQLiteStore(path, record_type)
+        try:
+            return database.import_records(records, replace=True)
+        finally:
+            database.close()
+    with atomic_write(path, backups=backups) as json_file:
+        return write_json_array(json_file, records)
+
+
+def iter_csv(path, record_type):
+    """
+    Stream the rows of a CSV file with a header line as records. Category
+    list cells are split on commas.
+    """
+    list_fields = record_type.fields_of_kind("category_list")
+    with open(path, newline="", encoding="utf-8-sig") as csv_file:
+        for row in csv.DictReader(csv_file):
+            # Drop the values of cells that have no header
+            row.pop(None, None)
+            yield _split_lists(row, list_fields)
+
+
+def parse_table(text, record_type):
+    """
+    Parse a comma- or tab-separated table, e.g. pasted from a spreadsheet,
+    into rows. A first line made of field names is used as the header;
+    otherwise the columns follow the form order, without the ID.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    delimiter = "\t" if "\t" in text.splitlines()[0] else ","
+    lines = csv.reader(io.StringIO(text), delimiter=delimiter)
+
+    first = [cell.strip() for cell in next(lines)]
+    if all(cell in record_type.fields for cell in first if cell):
+        header, pending = first, []
+    else:
+        header, pending = record_type.fields[1:], [first]
+
+    list_fields = record_type.fields_of_kind("category_list")
+    rows = []
+    for stream in (pending, lines):
+        for cells in stream:
+            cells = [cell.strip() for cell in cells]
+            if any(cells):
+                rows.append(_split_lists(dict(zip(header, cells)), list_fields))
+    return rows
+
+
+def write_csv(path, records, record_type, backups=0):
+    list_fields = record_type.fields_of_kind("category_list")
+    count = 0
+    with atomic_write(path, backups=backups, newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=record_type.fields, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            row = dict(record)
+            for field in list_fields:
+                if isinstance(row.get(field), list):
+                    row[field] = LIST_SEPARATOR.join(row[field])
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def iter_jsonl(path):
+    """
+    Stream the records of a JSON Lines file, skipping blank lines.
+    """
+    with open(path, encoding="utf-8-sig") as jsonl_file:
+        for line_number, line in enumerate(jsonl_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+
+
+def write_jsonl(path, records, backups=0):
+    count = 0
+    with atomic_write(path, backups=backups, encoding="utf-8") as jsonl_file:
+        for record in records:
+            jsonl_file.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def _split_lists(row, list_fields):
+    # Category list cells hold comma-separated values
+    for field in list_fields:
+        if field in row:
+            row[field] = [value.strip() for value in (row[field] or "").split(",") if value.strip()]
+    return row
+
+
+def _iter_storage(path, record_type):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    # Reading a source must not rewrite it, nor fix up its duplicate IDs
+    storage = open_storage(path, record_type, read_only=True)
+    try:
+        yield from storage.iter_records()
+    finally:
+        storage.close()
@@ -0,0 +1,39 @@
+from collections import deque
+
+# Edits that can be undone per repository; the oldest are dropped first
+UNDO_LIMIT = 10000
+
+
+class History:
+    """
+    Undo and redo stacks of inverse operations.
+
+    An operation is a small tuple the repository knows how to apply:
+    ``("insert", records)`` puts deleted records back, ``("delete", ids)``
+    removes added records and ``("update", id, fields)`` restores the
+    previous values of only the fields an edit changed. Applying one
+    returns its own inverse, which goes on the other stack. A step
+    therefore costs the size of the change rather than a copy of the data,
+    and deleted records stay in their compact stored form.
+    """
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+
+    def push(self, inverse):
+        """
+        Remember the inverse of a new edit. A new edit ends the redo chain.
+        """
+        self.undo_stack.append(inverse)
+        self.redo_stack.clear()
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
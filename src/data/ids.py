@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+# Crockford's base32: digits and capitals without I, L, O and U, so IDs
+# sort as text in the order they were generated and read unambiguously
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# 10 characters of milliseconds since the epoch, then 6 of sequence
+TIME_LENGTH = 10
+SEQUENCE_LENGTH = 6
+
+_SEQUENCE_LIMIT = 1 << (5 * SEQUENCE_LENGTH)
+
+# Each millisecond starts its sequence at a random point in the lower half,
+# leaving at least half a billion IDs before it runs out
+_SEQUENCE_START_LIMIT = _SEQUENCE_LIMIT >> 1
+
+# Any 10 bits as two characters, so a sequence encodes in three lookups
+_PAIRS = [ALPHABET[number >> 5] + ALPHABET[number & 31] for number in range(1024)]
+
+
+def _encode(number, length):
+    characters = []
+    for _ in range(length):
+        characters.append(ALPHABET[number & 31])
+        number >>= 5
+    return "".join(reversed(characters))
+
+
+class IdGenerator:
+    """
+    Time-ordered record IDs in the spirit of ULIDs, 16 characters long.
+
+    An ID is the current time in milliseconds followed by a sequence that
+    starts at a random number every millisecond and counts up within it.
+    IDs of one process therefore always increase, even within one
+    millisecond or if the clock steps back, and sort by creation time. The
+    random start keeps IDs made by other processes at the same moment
+    apart. Appending them keeps SQLite's primary key index and the sorted
+    files in insertion order.
+    """
+
+    def __init__(self, clock=time.time_ns):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._milliseconds = -1
+        self._prefix = ""
+        self._sequence = 0
+
+    def generate(self):
+        with self._lock:
+            milliseconds = self._clock() // 1000000
+            if milliseconds > self._milliseconds:
+                self._start(milliseconds)
+            else:
+                self._sequence += 1
+                if self._sequence >= _SEQUENCE_LIMIT:
+                    # Borrow the next millisecond rather than wrap around
+                    self._start(self._milliseconds + 1)
+            sequence = self._sequence
+            prefix = self._prefix
+        return prefix + _PAIRS[sequence >> 20] + _PAIRS[(sequence >> 10) & 1023] + _PAIRS[sequence & 1023]
+
+    def _start(self, milliseconds):
+        self._milliseconds = milliseconds
+        self._prefix = _encode(milliseconds, TIME_LENGTH)
+        self._sequence = int.from_bytes(os.urandom(4), "big") % _SEQUENCE_START_LIMIT
+
+
+generator = IdGenerator()
+generate_id = generator.generate
@@ -0,0 +1,314 @@
+import json
+import os
+import threading
+from src.data.atomic import atomic_write
+from src.data.json_stream import JSONArrayReader, write_json_array
+from src.data.records import FIELD_ALIASES, normalize_keys
+from src.data.snapshot import Snapshot, is_snapshot, write_snapshot
+
+
+class JournalStore:
+    """
+    Append-only storage engine for a JSON (or ``.sdgs`` snapshot) data file.
+
+    Every add, update and delete is appended as one line to a write-ahead
+    journal that lives next to the ``.json`` file, so an edit costs the size
+    of the changed record instead of the size of the whole dataset. Once the
+    journal grows past ``compact_threshold`` operations it is folded back into
+    the plain JSON array on a background thread. The base file is always
+    replaced atomically, keeping ``backups`` copies of the previous ones.
+
+    Replaying a journal is idempotent: an add replaces a base record with the
+    same ID, and a delete always drops it. A crash between swapping in a
+    compacted base file and removing the rotated journal therefore replays
+    that journal harmlessly on the next open. A failed compaction keeps the
+    rotated journal for the next one and is remembered in ``error``, which
+    closing the store raises.
+
+    Base records without an ID, or repeating the ID of an earlier record,
+    get a new ID made from their position in the file. It is the same on
+    every read, so edits journaled against it find the record again, and
+    compaction writes it into the file. The last read or compaction lists
+    the changes in ``rekeyed`` as ``(old ID, new ID)`` pairs.
+
+    A ``read_only`` store never writes: it yields the base records with the
+    IDs they have in the file, so callers can report duplicates, refuses
+    edits, and leaves the journal for the next writer to compact.
+    """
+
+    def __init__(self, json_path, compact_threshold=1000, record_type=None, backups=0, read_only=False):
+        self.json_path = json_path
+        self.journal_path = json_path + ".journal"
+        self.compacting_path = json_path + ".journal.compacting"
+        self.compact_threshold = compact_threshold
+        self.record_type = record_type
+        self.backups = backups
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        self._readers_done = threading.Condition(self._lock)
+        self._pending_ops = self._count_lines(self.journal_path)
+        self._compact_thread = None
+        self._readers = 0
+        self._reader = None
+        self._rekeys_pending = False
+        self.rekeyed = []
+        self.error = None
+
+    def load(self):
+        """
+        Return the current records as a list.
+        """
+        return list(self.iter_records())
+
+    def iter_records(self):
+        """
+        Yield the current records: the JSON base file, streamed one record at
+        a time, with every journaled operation applied on top of it.
+
+        The journal is read up to its size when iteration starts, so edits
+        appended while a worker thread is loading are not picked up twice,
+        and no compaction swaps the files out from under the reader.
+        """
+        while True:
+            with self._lock:
+                thread = self._compact_thread
+                if thread is None or not thread.is_alive():
+                    self._readers += 1
+                    journal_size = self._file_size(self.journal_path)
+                    break
+            # Let a running compaction finish before reading the files
+            thread.join()
+
+        try:
+            changes, added = {}, {}
+            self._fold(self._read_journal(self.compacting_path), changes, added)
+            self._fold(self._read_journal(self.journal_path, journal_size), changes, added)
+
+            self.rekeyed = []
+            records = self._iter_base()
+            if not self.read_only:
+                records = self._unique_ids(records, self.rekeyed)
+            yield from self._apply(records, changes, added)
+            # Write the new IDs at the next compaction even if nothing is edited
+            self._rekeys_pending = bool(self.rekeyed)
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if not self._readers:
+                    self._readers_done.notify_all()
+
+    def progress(self):
+        """
+        Return the fraction of the base file read by the running
+        ``iter_records`` call, or None if it is not known yet.
+        """
+        reader = self._reader
+        return reader.progress() if reader is not None else None
+
+    def add(self, record):
+        """
+        Journal a newly added record.
+        """
+        self._append({"op": "add", "record": record})
+
+    def add_many(self, records):
+        """
+        Journal many newly added records with a single write.
+        """
+        self._append(*({"op": "add", "record": record} for record in records))
+
+    def update(self, record_id, fields):
+        """
+        Journal an update of the record with the given ID.
+        """
+        self._append({"op": "update", "id": str(record_id), "fields": fields})
+
+    def delete(self, record_id):
+        """
+        Journal the deletion of the record with the given ID.
+        """
+        self._append({"op": "delete", "id": str(record_id)})
+
+    def compact(self, wait=False):
+        """
+        Fold the journal into the JSON base file on a background thread.
+
+        Pass ``wait=True`` to block until the journal is empty, including
+        edits made while an earlier compaction was running, and to raise the
+        error of a failed compaction.
+        """
+        if self.read_only:
+            return
+        while True:
+            with self._lock:
+                if wait:
+                    # A load is reading the files; wait for it rather than skip compacting
+                    while self._readers:
+                        self._readers_done.wait()
+                running = self._compact_thread is not None and self._compact_thread.is_alive()
+                has_work = (os.path.exists(self.journal_path) or os.path.exists(self.compacting_path)
+                            or self._rekeys_pending)
+
+                # Never swap files while a load is reading them; retry on a later edit
+                started = not running and has_work and not self._readers
+                if started:
+                    # Rotate the journal so new edits keep appending while we compact
+                    if not os.path.exists(self.compacting_path) and os.path.exists(self.journal_path):
+                        os.replace(self.journal_path, self.compacting_path)
+                        self._pending_ops = 0
+                    self._compact_thread = threading.Thread(target=self._compact_worker, daemon=True)
+                    self._compact_thread.start()
+                thread = self._compact_thread
+
+            if not wait or not (running or started):
+                break
+            thread.join()
+            if started and self.error is not None:
+                raise self.error
+
+    def close(self):
+        """
+        Compact any outstanding journal entries and wait for it to finish,
+        raising the error of a failed compaction.
+        """
+        self.compact(wait=True)
+
+    def _append(self, *entries):
+        if self.read_only:
+            raise ValueError(f"{self.json_path} is open read-only.")
+        lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with self._lock:
+            with open(self.journal_path, "a") as journal_file:
+                journal_file.write(lines)
+            self._pending_ops += len(entries)
+            should_compact = self._pending_ops >= self.compact_threshold
+
+        if should_compact:
+            self.compact()
+
+    def _compact_worker(self):
+        # Stream the base file through the rotated journal and swap it in
+        rekeyed = []
+        try:
+            changes, added = {}, {}
+            self._fold(self._read_journal(self.compacting_path), changes, added)
+
+            # Readers wait for this thread, so the base file can be swapped without the lock
+            records = self._apply(self._unique_ids(self._iter_base(), rekeyed), changes, added)
+            if is_snapshot(self.json_path):
+                write_snapshot(self.json_path, records, self.record_type, self.backups)
+            else:
+                with atomic_write(self.json_path, backups=self.backups) as json_file:
+                    write_json_array(json_file, records)
+        except Exception as e:
+            # The rotated journal stays for the next compaction to retry
+            self.error = e
+            return
+
+        with self._lock:
+            self.error = None
+            if os.path.exists(self.compacting_path):
+                os.remove(self.compacting_path)
+            # The new IDs are in the file now
+            self.rekeyed = rekeyed
+            self._rekeys_pending = False
+
+    def _iter_base(self):
+        if not os.path.exists(self.json_path):
+            return
+        if is_snapshot(self.json_path):
+            with Snapshot(self.json_path) as snapshot:
+                self._reader = snapshot
+                yield from snapshot
+        else:
+            self._reader = JSONArrayReader(self.json_path)
+            yield from self._reader
+
+    @staticmethod
+    def _unique_ids(records, rekeyed):
+        seen = set()
+        for position, record in enumerate(records, 1):
+            record_id = record.get("ID")
+            if record_id is None or record_id == "" or str(record_id) in seen:
+                new_id = f"{record_id}-{position}" if record_id not in (None, "") else f"row-{position}"
+                while new_id in seen:
+                    new_id = f"{new_id}-{position}"
+                rekeyed.append((record_id, new_id))
+                record = {"ID": new_id, **{field: value for field, value in record.items() if field != "ID"}}
+                record_id = new_id
+            seen.add(str(record_id))
+            yield record
+
+    @staticmethod
+    def _read_journal(journal_path, size=None):
+        if not os.path.exists(journal_path):
+            return []
+        entries = []
+        with open(journal_path, "rb") as journal_file:
+            content = journal_file.read() if size is None else journal_file.read(size)
+            for line in content.decode("utf-8").splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append; ignore it
+                    break
+        return entries
+
+    @staticmethod
+    def _fold(entries, changes, added):
+        # Collapse journal entries into per-ID changes for the base records
+        # (None for deleted, else merged fields) and the records added since.
+        # An add supersedes whatever the base holds for its ID, and a delete
+        # drops the base record even if the ID was added in between, so the
+        # result is the same whether or not the base already has these edits
+        for entry in entries:
+            op = entry.get("op")
+            if op == "add":
+                record_id = str(entry["record"].get("ID"))
+                added[record_id] = entry["record"]
+                changes.pop(record_id, None)
+            elif op == "update":
+                record_id = entry["id"]
+                if record_id in added:
+                    added[record_id].update(entry["fields"])
+                elif changes.get(record_id, {}) is not None:
+                    changes.setdefault(record_id, {}).update(entry["fields"])
+            elif op == "delete":
+                record_id = entry["id"]
+                added.pop(record_id, None)
+                changes[record_id] = None
+
+    @staticmethod
+    def _apply(records, changes, added):
+        added = dict(added)
+        for record in records:
+            record_id = str(record.get("ID"))
+            if record_id in added:
+                # Added again, e.g. undone delete or a replayed journal: upsert in place
+                yield added.pop(record_id)
+                continue
+            change = changes.get(record_id, {})
+            if change is None:
+                continue
+            if any(alias in record for alias in FIELD_ALIASES):
+                # Records of older files are written back under the schema fields, as exports are
+                record = normalize_keys(record)
+            if change:
+                record.update(change)
+            yield record
+        yield from added.values()
+
+    @staticmethod
+    def _file_size(path):
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    @staticmethod
+    def _count_lines(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as journal_file:
+            return sum(1 for _ in journal_file)
@@ -0,0 +1,106 @@
+import codecs
+import json
+import os
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONArrayReader:
+    """
+    Incremental reader for a file holding one top-level JSON array.
+
+    Iterating yields the array items one at a time. Only the current chunk
+    and the item being decoded are kept in memory, so peak memory does not
+    grow with the size of the file. ``progress()`` can be polled from
+    another thread while the items are being read.
+    """
+
+    def __init__(self, path, chunk_size=1 << 16):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def progress(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else None
+
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+        with open(self.path, "rb") as json_file:
+            buffer = ""
+            index = 0
+            eof = False
+
+            def fill():
+                # Drop consumed text and append the next chunk
+                nonlocal buffer, index, eof
+                chunk = json_file.read(self.chunk_size)
+                self.bytes_read += len(chunk)
+                eof = not chunk
+                buffer = buffer[index:] + text_decoder.decode(chunk, final=eof)
+                index = 0
+
+            def skip_whitespace():
+                nonlocal index
+                while True:
+                    while index < len(buffer) and buffer[index] in _WHITESPACE:
+                        index += 1
+                    if index < len(buffer) or eof:
+                        return
+                    fill()
+
+            skip_whitespace()
+            if buffer[index:index + 1] != "[":
+                raise ValueError(f"{self.path} does not contain a JSON array")
+            index += 1
+
+            expect_item = True
+            while True:
+                skip_whitespace()
+                if index >= len(buffer):
+                    raise ValueError(f"Unexpected end of file in {self.path}")
+
+                if buffer[index] == "]":
+                    return
+                if not expect_item:
+                    if buffer[index] != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", buffer, index)
+                    index += 1
+                    skip_whitespace()
+
+                # Decode the next item, reading more text until it is complete
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(buffer, index)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        fill()
+                        continue
+                    if end == len(buffer) and not eof:
+                        # A number may continue in the next chunk
+                        fill()
+                        continue
+                    break
+
+                index = end
+                expect_item = False
+                yield item
+
+
+def write_json_array(json_file, items, indent=4):
+    """
+    Write ``items`` to ``json_file`` one at a time, producing the same text
+    as ``json.dump(list(items), json_file, indent=indent)``. Returns the
+    number of items written.
+    """
+    prefix = " " * indent
+    count = 0
+    for item in items:
+        text = json.dumps(item, indent=indent).replace("\n", "\n" + prefix)
+        json_file.write(("[\n" if count == 0 else ",\n") + prefix + text)
+        count += 1
+    json_file.write("\n]" if count else "[]")
+    return count
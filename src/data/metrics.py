@@ -0,0 +1,181 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src.data.atomic import atomic_write
+
+# Path to dump the metrics to on exit; setting it turns instrumentation on
+METRICS_ENV_VAR = "SDGPY_METRICS"
+FOLDED_SUFFIX = ".folded"
+
+
+class MetricsRegistry:
+    """
+    In-process registry of timings, row counts and bytes, off by default.
+
+    Code marks its hot paths with ``span(name)`` (or the ``instrumented``
+    decorator) and reports work done inside a span with ``count``. Spans
+    nest per thread: every metric gets its number of calls, total and
+    longest time, rows and bytes, and the time spent in each span but not
+    in its child spans is summed per call stack for a flamegraph. While
+    the registry is disabled spans cost a single attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        # Where to dump the metrics when the process exits, if anywhere
+        self.dump_path = None
+        self.metrics = {}
+        self.stacks = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Time the enclosed block as one call of the metric ``name``.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        # [name, counts of this span, time spent in child spans]
+        entry = [name, {"rows": 0, "bytes": 0}, 0.0]
+        stack.append(entry)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][2] += seconds
+            path = ";".join([parent[0] for parent in stack] + [name])
+            self._add(name, seconds, entry[1]["rows"], entry[1]["bytes"], path, seconds - entry[2])
+
+    def count(self, rows=0, bytes=0):
+        """
+        Add rows and bytes to the innermost span running on this thread.
+        """
+        if not self.enabled:
+            return
+        stack = self._stack()
+        if stack:
+            counts = stack[-1][1]
+            counts["rows"] += rows
+            counts["bytes"] += bytes
+
+    def record(self, name, seconds, rows=0, bytes=0):
+        """
+        Record a call measured elsewhere, e.g. one spanning several event
+        loop callbacks.
+        """
+        if self.enabled:
+            self._add(name, seconds, rows, bytes, name, seconds)
+
+    def reset(self):
+        with self._lock:
+            self.metrics.clear()
+            self.stacks.clear()
+
+    def to_dict(self):
+        with self._lock:
+            return {name: dict(metric) for name, metric in sorted(self.metrics.items())}
+
+    def folded(self):
+        """
+        Return the self time of every call stack in microseconds, in the
+        folded format read by flamegraph.pl, speedscope and similar tools.
+        """
+        with self._lock:
+            return "".join(f"{path} {round(seconds * 1e6)}\n" for path, seconds in sorted(self.stacks.items()))
+
+    def dump(self, path):
+        """
+        Write the metrics to ``path`` as JSON and the folded stacks next to
+        it with a ``.folded`` suffix.
+        """
+        with atomic_write(path) as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=4)
+        with atomic_write(path + FOLDED_SUFFIX) as folded_file:
+            folded_file.write(self.folded())
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, name, seconds, rows, bytes, path, self_seconds):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0}
+            metric["calls"] += 1
+            metric["seconds"] += seconds
+            metric["max_seconds"] = max(metric["max_seconds"], seconds)
+            metric["rows"] += rows
+            metric["bytes"] += bytes
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_seconds
+
+
+registry = MetricsRegistry()
+span = registry.span
+count = registry.count
+
+
+@atexit.register
+def _dump_on_exit():
+    if registry.dump_path:
+        registry.dump(registry.dump_path)
+
+
+def instrumented(func):
+    """
+    Decorator timing every call of a function or method as a span named
+    after its qualified name, e.g. ``ManageWasteDataFrame.add_data``.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return func(*args, **kwargs)
+        with registry.span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def enable(dump_path=None):
+    """
+    Turn instrumentation on, dumping the metrics to ``dump_path`` when the
+    process exits if it is given. Calling it again only changes the path,
+    so the metrics are dumped once, to the last path given.
+    """
+    registry.enabled = True
+    if dump_path:
+        registry.dump_path = dump_path
+
+
+def enable_from_environment():
+    """
+    Turn instrumentation on if the ``SDGPY_METRICS`` environment variable
+    names a dump path.
+    """
+    path = os.environ.get(METRICS_ENV_VAR)
+    if path:
+        enable(path)
+
+
+def file_size(path):
+    # Size of a file for the byte counts, 0 if it cannot be read
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,207 @@
+import itertools
+
+from src.data.records import to_dict
+
+# Number of sort orders cached at once
+MAX_CACHED_ORDERS = 8
+
+
+class RecordStore:
+    """
+    In-memory keyed store for the records of one opened file.
+
+    Records are kept in a dict keyed by their ID, next to a list holding the
+    insertion order, so lookups, updates and deletes cost O(1) instead of a
+    scan over the whole dataset. Deleted slots in the order list are left as
+    holes and squeezed out lazily the next time the order is read.
+
+    Sorted orders of the IDs are cached until the records change, so
+    sorting the same way again costs nothing.
+
+    With a ``record_class`` (see ``src.data.records``) added dicts are kept
+    as compact slotted records instead.
+    """
+
+    def __init__(self, records=(), record_class=None):
+        self.record_class = record_class
+        self._records = {}
+        self._order = []
+        self._positions = {}
+        self._holes = 0
+        self._sorted = {}
+
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, record_id):
+        return str(record_id) in self._records
+
+    def __iter__(self):
+        return self.records()
+
+    def get(self, record_id, default=None):
+        """
+        Return the record with the given ID, or ``default``.
+        """
+        return self._records.get(str(record_id), default)
+
+    def add(self, record):
+        """
+        Append a record. Raises ``KeyError`` if its ID is already stored.
+        """
+        record_id = str(record.get("ID"))
+        if record_id in self._records:
+            raise KeyError(f"Duplicate ID: {record_id}")
+        if self.record_class is not None and type(record) is dict:
+            record = self.record_class.from_dict(record)
+
+        self._records[record_id] = record
+        self._positions[record_id] = len(self._order)
+        self._order.append(record_id)
+        self._changed()
+        return record
+
+    def update(self, record_id, fields):
+        """
+        Merge ``fields`` into the record with the given ID and return it.
+        """
+        record_id = str(record_id)
+        record = self._records[record_id]
+        if type(record) is dict:
+            record.update(fields)
+        else:
+            # Slotted records are rebuilt from the merged fields
+            merged = record.to_dict()
+            merged.update(fields)
+            record = self._records[record_id] = type(record).from_dict(merged)
+        self._changed()
+        return record
+
+    def delete(self, record_id):
+        """
+        Remove the record with the given ID and return it.
+        """
+        record_id = str(record_id)
+        record = self._records.pop(record_id)
+        self._order[self._positions.pop(record_id)] = None
+        self._holes += 1
+        self._changed()
+        return record
+
+    def indexes(self, record_ids):
+        """
+        Return the index of each of the given IDs in ``ids()``.
+        """
+        self.ids()
+        return [self._positions[str(record_id)] for record_id in record_ids]
+
+    def restore(self, records, indexes):
+        """
+        Put deleted records back at the indexes ``indexes`` returned for
+        them before they were deleted, e.g. to undo the deletion. Returns
+        the stored records.
+        """
+        stored = []
+        for record in records:
+            record_id = str(record.get("ID"))
+            if record_id in self._records:
+                raise KeyError(f"Duplicate ID: {record_id}")
+            if self.record_class is not None and type(record) is dict:
+                record = self.record_class.from_dict(record)
+            self._records[record_id] = record
+            stored.append(record)
+
+        # Merge the IDs into the order in one pass; the indexes are their final places
+        order = iter(self.ids())
+        merged = []
+        for index, record in sorted(zip(indexes, stored), key=lambda pair: pair[0]):
+            merged.extend(itertools.islice(order, index - len(merged)))
+            merged.append(str(record.get("ID")))
+        merged.extend(order)
+        self._order = merged
+        self._positions = {record_id: index for index, record_id in enumerate(merged)}
+        self._changed()
+        return stored
+
+    def clear(self):
+        self._records.clear()
+        self._order.clear()
+        self._positions.clear()
+        self._holes = 0
+        self._changed()
+
+    def ids(self):
+        """
+        Return the stored IDs in insertion order.
+        """
+        if self._holes:
+            self._compact_order()
+        return self._order
+
+    def sorted_ids(self, keys):
+        """
+        Return the stored IDs ordered by ``keys``, a sequence of
+        ``(field, numeric, descending)`` tuples with the primary key first.
+        Numeric fields sort by value with non-numbers last; other fields
+        sort case-insensitively. Ties keep the insertion order.
+        """
+        keys = tuple(keys)
+        if not keys:
+            return self.ids()
+
+        ids = self._sorted.get(keys)
+        if ids is None:
+            # Stable sorts from the least to the most significant key
+            ids = list(self.ids())
+            records = self._records
+            for field, numeric, descending in reversed(keys):
+                if numeric:
+                    # Negate instead of reversing so non-numbers stay last
+                    sign = -1.0 if descending else 1.0
+                    ids.sort(key=lambda record_id: _numeric_key(records[record_id].get(field), sign))
+                else:
+                    ids.sort(key=lambda record_id: _text_key(records[record_id].get(field)), reverse=descending)
+
+            if len(self._sorted) >= MAX_CACHED_ORDERS:
+                self._sorted.clear()
+            self._sorted[keys] = ids
+        return ids
+
+    def records(self):
+        """
+        Iterate over the stored records in insertion order.
+        """
+        records = self._records
+        for record_id in self.ids():
+            yield records[record_id]
+
+    def to_list(self):
+        """
+        Return the records as a plain list, ready to be dumped as JSON.
+        """
+        return [to_dict(record) for record in self.records()]
+
+    def _changed(self):
+        if self._sorted:
+            self._sorted.clear()
+
+    def _compact_order(self):
+        self._order = [record_id for record_id in self._order if record_id is not None]
+        self._positions = {record_id: index for index, record_id in enumerate(self._order)}
+        self._holes = 0
+
+
+def _numeric_key(value, sign=1.0):
+    try:
+        return (0, sign * float(value))
+    except (TypeError, ValueError):
+        return (1, 0.0)
+
+
+def _text_key(value):
+    if isinstance(value, list):
+        value = ", ".join(value)
+    return str(value if value is not None else "").casefold()
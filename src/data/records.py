@@ -0,0 +1,209 @@
+from src.data.schema import FACILITIES, PROTOCOLS, WASTE_PROFILES
+
+# Keys written by earlier versions of the forms, and the fields they mean
+FIELD_ALIASES = {
+    "Categories": "Category",
+    "Method Categories": "Method",
+    "Transportation Categories": "Transportation",
+}
+
+_MISSING = object()
+
+
+def attribute_name(field):
+    return field.lower().replace(" ", "_")
+
+
+class CategoryCodes:
+    """
+    Dictionary of the distinct values of one category field, shared by all
+    records of a type. The form options are added first, so their codes are
+    their positions in the option list.
+    """
+
+    def __init__(self, options=()):
+        self.values = []
+        self.codes = {}
+        for option in options:
+            self.code(option)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, mask):
+        """
+        Return the values of the bits set in ``mask``, in code order.
+        """
+        values = []
+        while mask:
+            low = mask & -mask
+            values.append(self.values[low.bit_length() - 1])
+            mask ^= low
+        return values
+
+
+def encode_list(codes, values):
+    """
+    Encode a category list as a bitmask when it is in code order without
+    repeats, which is what the forms produce, so the bitmask gives back the
+    same list. Other lists are kept as tuples of codes.
+    """
+    encoded = tuple(codes.code(value) for value in values)
+    if all(previous < code for previous, code in zip(encoded, encoded[1:])):
+        mask = 0
+        for code in encoded:
+            mask |= 1 << code
+        return mask
+    return encoded
+
+
+class Record:
+    """
+    Compact in-memory record with one slot per schema field.
+
+    Single categories with a fixed option list (Facility Type) are stored
+    as integer codes into per-field ``CategoryCodes`` and category lists as
+    integer bitmasks over those codes (tuples of codes if the list is out
+    of option order), so each category name is kept once per type instead
+    of once per record and list fields are never split from strings again.
+    Free-text categories such as City stay plain strings, as the codes are
+    shared by every file loaded. Fields absent from the source dict stay
+    unset, so ``to_dict`` gives back the keys that were loaded, in schema
+    order.
+
+    Records read like a dict (``get``, ``[]``, ``in``, ``keys``, ``items``),
+    which is all the store, the search index and the aggregators need.
+    """
+
+    __slots__ = ()
+    record_type = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        record_type = cls.record_type
+        cls._attributes = {field: attribute_name(field) for field in record_type.fields}
+        cls._kinds = record_type.kinds
+        cls._codes = {field: CategoryCodes(record_type.options.get(field, ()))
+                      for field in record_type.fields
+                      if record_type.kinds[field] == "category_list" or field in record_type.options}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Return ``data`` as a compact record. Dicts that do not fit the
+        schema (unknown keys or unexpected value types) are returned
+        unchanged so nothing is lost on the way back to disk.
+        """
+        if any(alias in data for alias in FIELD_ALIASES):
+            data = normalize_keys(data)
+        if not cls._fits(data):
+            return data
+
+        record = cls()
+        for field, value in data.items():
+            codes = cls._codes.get(field)
+            if codes is not None:
+                value = codes.code(value) if cls._kinds[field] == "category" else encode_list(codes, value)
+            setattr(record, cls._attributes[field], value)
+        return record
+
+    @classmethod
+    def _fits(cls, data):
+        kinds = cls._kinds
+        for field, value in data.items():
+            kind = kinds.get(field)
+            if kind is None:
+                return False
+            if kind == "category_list":
+                if type(value) is not list or any(type(item) is not str for item in value):
+                    return False
+            elif kind == "numeric":
+                if type(value) not in (str, int, float):
+                    return False
+            elif type(value) is not str:
+                return False
+        return True
+
+    def get(self, field, default=None):
+        attribute = self._attributes.get(field)
+        if attribute is None:
+            return default
+        value = getattr(self, attribute, _MISSING)
+        if value is _MISSING:
+            return default
+
+        codes = self._codes.get(field)
+        if codes is None:
+            return value
+        if self._kinds[field] == "category":
+            return codes.values[value]
+        if type(value) is int:
+            return codes.decode(value)
+        return [codes.values[code] for code in value]
+
+    def __getitem__(self, field):
+        value = self.get(field, _MISSING)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field):
+        attribute = self._attributes.get(field)
+        return attribute is not None and hasattr(self, attribute)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def keys(self):
+        return [field for field, attribute in self._attributes.items() if hasattr(self, attribute)]
+
+    def items(self):
+        return [(field, self.get(field)) for field in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class WasteProfile(Record):
+    __slots__ = ("id", "city", "category", "quantity", "notes")
+    record_type = WASTE_PROFILES
+
+
+class Protocol(Record):
+    __slots__ = ("id", "city", "area", "frequency", "method", "transportation", "notes")
+    record_type = PROTOCOLS
+
+
+class Facility(Record):
+    __slots__ = ("id", "facility_name", "area", "operating_hours", "address", "facility_type",
+                 "disposal_methods", "notes")
+    record_type = FACILITIES
+
+
+def normalize_keys(data):
+    """
+    Rename the keys older versions of the forms used to the schema fields.
+    An old key next to its schema field is left over from an edit that only
+    wrote the new field, so it is dropped.
+    """
+    return {FIELD_ALIASES.get(key, key): value for key, value in data.items() if FIELD_ALIASES.get(key) not in data}
+
+
+def to_dict(record):
+    """
+    Return a plain dict for a stored record, ready to be dumped as JSON.
+    """
+    return record.to_dict() if isinstance(record, Record) else record
@@ -0,0 +1,245 @@
+import json
+import math
+import os
+
+from src.data.atomic import atomic_write
+from src.data.schema import FACILITIES, PROTOCOLS, WASTE_PROFILES, detect_record_type
+
+# Aggregates are saved next to the data file under this suffix
+AGGREGATES_SUFFIX = ".aggregates.json"
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _values(value):
+    # Category list fields hold lists; single categories hold one value
+    if isinstance(value, list):
+        return set(value)
+    return {value} if value else set()
+
+
+class GroupTotals:
+    """
+    Record counts and summed amounts per group key.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, key, amount, sign=1):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0, 0.0]
+        group[0] += sign
+        group[1] += sign * amount
+        if group[0] == 0:
+            del self.groups[key]
+
+    def rows(self):
+        """
+        Return ``(key, count, total)`` rows, largest total first.
+        """
+        return sorted(((key, count, total) for key, (count, total) in self.groups.items()),
+                      key=lambda row: (-row[2], -row[1], str(row[0])))
+
+    def to_dict(self):
+        return {key: list(group) for key, group in self.groups.items()}
+
+    def load(self, groups):
+        self.groups = {key: [count, total] for key, (count, total) in groups.items()}
+
+
+class Aggregator:
+    """
+    Running totals over the records of one record type.
+
+    Records are fed one at a time with ``add`` (and taken back out with
+    ``remove``), so a report over a file of any size is a single streaming
+    pass whose memory only grows with the number of distinct groups.
+    """
+
+    record_type = None
+    title = ""
+
+    # Field summed per group and its unit
+    amount_field = None
+    unit = ""
+
+    # (field, heading) pairs of the group totals
+    groupings = ()
+
+    def __init__(self):
+        self.records = 0
+        self.total = 0.0
+        self.missing = 0
+        self.groups = {field: GroupTotals() for field, _ in self.groupings}
+
+    def add(self, record, sign=1):
+        amount = _number(record.get(self.amount_field))
+        self.records += sign
+        if amount is None:
+            self.missing += sign
+            amount = 0.0
+        self.total += sign * amount
+        for field, _ in self.groupings:
+            groups = self.groups[field]
+            for key in _values(record.get(field)):
+                groups.add(key, amount, sign)
+
+    def remove(self, record):
+        self.add(record, -1)
+
+    def to_dict(self):
+        return {
+            "records": self.records,
+            "total": self.total,
+            "missing": self.missing,
+            "groups": {field: groups.to_dict() for field, groups in self.groups.items()},
+        }
+
+    def load(self, data):
+        self.records = data["records"]
+        self.total = data["total"]
+        self.missing = data["missing"]
+        for field, groups in data["groups"].items():
+            self.groups[field].load(groups)
+
+    def summary(self):
+        """
+        Return a one-line summary of the totals.
+        """
+        return f"{self.records:,} records, {self.total:,.2f} {self.unit}"
+
+    def format(self):
+        """
+        Return the report as plain text.
+        """
+        lines = [self.title, "=" * len(self.title), ""]
+        lines.append(f"Records: {self.records:,}")
+        lines.append(f"Total {self.amount_field.lower()}: {self.total:,.2f} {self.unit}")
+        lines.append(f"Records without a numeric {self.amount_field.lower()}: {self.missing:,}")
+
+        for field, heading in self.groupings:
+            lines += ["", heading, "-" * len(heading)]
+            rows = self.groups[field].rows()
+            if not rows:
+                lines.append("(no data)")
+            for key, count, total in rows:
+                share = count / self.records * 100 if self.records else 0.0
+                lines.append(f"{str(key):<40} {total:>16,.2f} {self.unit:<6} {count:>10,} records ({share:.1f}%)")
+        lines.append("")
+        return "\n".join(lines)
+
+
+class WasteProfileAggregator(Aggregator):
+    record_type = WASTE_PROFILES
+    title = "Waste Profile Report"
+    amount_field = "Quantity"
+    unit = "tonnes"
+    groupings = (
+        ("City", "Tonnes by City"),
+        ("Category", "Tonnes by Category (records with several categories count toward each)"),
+    )
+
+
+class ProtocolAggregator(Aggregator):
+    record_type = PROTOCOLS
+    title = "Collection and Transportation Report"
+    amount_field = "Area"
+    unit = "sq m"
+    groupings = (
+        ("Method", "Coverage by Collection Method"),
+        ("Transportation", "Coverage by Transportation Method"),
+        ("Frequency", "Coverage by Frequency"),
+    )
+
+
+class FacilityAggregator(Aggregator):
+    record_type = FACILITIES
+    title = "Waste Facility Report"
+    amount_field = "Area"
+    unit = "sq m"
+    groupings = (
+        ("Facility Type", "Facilities and Area by Type"),
+        ("Disposal Methods", "Facilities and Area by Disposal Method"),
+    )
+
+
+AGGREGATORS = {
+    aggregator.record_type.name: aggregator
+    for aggregator in (WasteProfileAggregator, ProtocolAggregator, FacilityAggregator)
+}
+
+
+def aggregate(records, record_type=None):
+    """
+    Aggregate a stream of records in a single pass and return the
+    aggregator. Without ``record_type`` it is guessed from the first record.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if record_type is None:
+        record_type = detect_record_type(first) if first is not None else WASTE_PROFILES
+
+    aggregator = AGGREGATORS[record_type.name]()
+    if first is not None:
+        aggregator.add(first)
+    for record in records:
+        aggregator.add(record)
+    return aggregator
+
+
+def save_aggregates(path, aggregator):
+    """
+    Save the running totals of the records in ``path`` next to it, together
+    with the size and modification time the file had, so they can be
+    trusted later without reading the file.
+    """
+    data = {
+        "record_type": aggregator.record_type.name,
+        "file": _fingerprint(path),
+        "aggregates": aggregator.to_dict(),
+    }
+    with atomic_write(path + AGGREGATES_SUFFIX) as aggregates_file:
+        json.dump(data, aggregates_file)
+
+
+def load_aggregates(path, record_type=None):
+    """
+    Return the saved aggregator of ``path``, or None if there is none or
+    the file (or its journal) changed since it was saved.
+    """
+    try:
+        with open(path + AGGREGATES_SUFFIX) as aggregates_file:
+            data = json.load(aggregates_file)
+    except (OSError, ValueError):
+        return None
+
+    if record_type is not None and data.get("record_type") != record_type.name:
+        return None
+    if data.get("file") != _fingerprint(path):
+        return None
+    # Journal entries not yet compacted into the file are not counted
+    if os.path.exists(path + ".journal") or os.path.exists(path + ".journal.compacting"):
+        return None
+
+    aggregator_class = AGGREGATORS.get(data.get("record_type"))
+    if aggregator_class is None:
+        return None
+    aggregator = aggregator_class()
+    aggregator.load(data["aggregates"])
+    return aggregator
+
+
+def _fingerprint(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
@@ -0,0 +1,503 @@
+import json
+import math
+import os
+
+from src.data.atomic import atomic_write
+from src.data.autosave import AUTOSAVE_EDITS, AutosaveStore
+from src.data.history import History
+from src.data.ids import generate_id
+from src.data.metrics import count, file_size, instrumented
+from src.data.record_store import RecordStore
+from src.data.records import Facility, Protocol, WasteProfile, normalize_keys, to_dict
+from src.data.reports import AGGREGATORS, save_aggregates
+from src.data.schema import FACILITIES, PROTOCOLS, WASTE_PROFILES
+from src.data.search_index import SearchIndex
+from src.data.snapshot import is_snapshot, write_snapshot
+from src.data.sqlite_store import SQLiteStore, is_sqlite
+from src.data.storage import open_storage
+
+
+class ValidationError(ValueError):
+    """
+    Raised when record fields fail validation. The message is meant to be
+    shown to the user as is.
+    """
+
+
+class Repository:
+    """
+    Headless access to one kind of record.
+
+    A repository owns the in-memory record store and the storage backend
+    of the opened file, validates and builds new records, generates IDs and
+    exports data. The Tkinter frames call into it and only turn its
+    exceptions into message boxes, so the same logic can run in batch jobs
+    without a GUI. A search index and the report totals are kept up to
+    date with every change; the totals are saved next to the file when it
+    is closed, once it has been read completely.
+    """
+
+    record_type = None
+    record_class = None
+
+    # (fields, message) pairs: the message is raised when any field is empty
+    required = ()
+
+    # Copies of the data file kept as .1.bak, .2.bak, ... each time it is rewritten
+    backups = 0
+
+    # Seconds of idle time before edits are written in the background; None writes each edit at once
+    autosave_delay = None
+    autosave_edits = AUTOSAVE_EDITS
+
+    def __init__(self):
+        self.records = RecordStore(record_class=self.record_class)
+        self.index = SearchIndex(self.record_type)
+        self.aggregates = AGGREGATORS[self.record_type.name]()
+        self.history = History()
+        self.storage = None
+        self.path = None
+
+        # Whether every record of the opened file has been read
+        self.loaded = False
+
+    @instrumented
+    def open(self, path):
+        """
+        Point the repository at a data file without reading it yet. The
+        records are then fed in with ``add_loaded``, e.g. from a
+        background loader iterating ``storage.iter_records``.
+        """
+        self.close()
+        self.storage = open_storage(path, self.record_type, self.backups)
+        if self.autosave_delay is not None:
+            self.storage = AutosaveStore(self.storage, self.autosave_delay, self.autosave_edits)
+        self.path = path
+        self.loaded = False
+        self.clear()
+        count(bytes=file_size(path))
+
+    def load(self, path):
+        """
+        Open a data file and read all of its records.
+        """
+        self.open(path)
+        self.add_loaded(self.storage.iter_records())
+        self.loaded = True
+        return self.records
+
+    def add_loaded(self, records):
+        """
+        Index records read from the storage backend, without persisting them.
+        """
+        for record in records:
+            self._insert(record)
+
+    def clear(self):
+        """
+        Forget the records held in memory and the undo history.
+        """
+        self.records = RecordStore(record_class=self.record_class)
+        self.index = SearchIndex(self.record_type)
+        self.aggregates = AGGREGATORS[self.record_type.name]()
+        self.history.clear()
+
+    @instrumented
+    def find(self, text="", facets=None, order=None):
+        """
+        Return the IDs of the records matching a search. See
+        ``SearchIndex.match`` for ``text`` and ``facets``.
+        ``order`` is a sequence of ``(field, descending)`` pairs to sort by;
+        without it the records keep their insertion order.
+        """
+        if order:
+            keys = [(field, self.record_type.kinds.get(field) == "numeric", descending)
+                    for field, descending in order]
+            ids = self.records.sorted_ids(keys)
+        else:
+            ids = self.records.ids()
+
+        bitmap = self.index.match(text, facets)
+        if bitmap is None:
+            return ids
+        matches = self.index.ids(bitmap)
+        if not order:
+            return matches
+
+        # Keep the cached sort order, restricted to the matches
+        matches = set(matches)
+        return [record_id for record_id in ids if record_id in matches]
+
+    def matches(self, record, text="", facets=None):
+        """
+        Return whether a record matches a search, e.g. to filter records
+        while they are loaded.
+        """
+        return self.index.matches(record, text, facets)
+
+    @property
+    def dirty(self):
+        """
+        Whether edits are still waiting to be autosaved.
+        """
+        return getattr(self.storage, "dirty", False)
+
+    @property
+    def rekeyed(self):
+        """
+        ``(old ID, new ID)`` pairs of the records of the opened file that
+        had no ID or a duplicate one and were given a new ID when read.
+        """
+        return getattr(self.storage, "rekeyed", [])
+
+    @property
+    def save_error(self):
+        """
+        The error of the last failed autosave, if it has not been retried
+        successfully since.
+        """
+        return getattr(self.storage, "error", None)
+
+    def close(self):
+        """
+        Close the storage backend of the opened file, if any, writing the
+        edits still waiting to be autosaved.
+        """
+        if self.storage is not None:
+            self.storage.close()
+            if self.loaded:
+                try:
+                    save_aggregates(self.path, self.aggregates)
+                except OSError:
+                    # The totals are only a cache; reports recompute them
+                    pass
+        self.storage = None
+        self.path = None
+        self.loaded = False
+
+    def validate(self, fields):
+        """
+        Check the fields of a form with the rules of ``check_rows``. Missing
+        fields are reported with the form's own messages.
+        """
+        for names, message in self.required:
+            if any(not fields.get(name) for name in names):
+                raise ValidationError(message)
+        problems = self._problems([fields])[0]
+        if problems:
+            raise ValidationError(" ".join(problems))
+
+    def build_record(self, record_id, fields):
+        # Lay the fields out in schema order, storing lists as JSON lists
+        record = {"ID": record_id}
+        for field in self.record_type.fields[1:]:
+            value = fields.get(field, "")
+            if self.record_type.kinds[field] == "category_list":
+                value = _category_values(value)
+            record[field] = value
+        return record
+
+    def check_rows(self, rows):
+        """
+        Validate many rows at once and return ``(records, errors)``: the
+        valid rows as new records and ``(row_number, message)`` pairs for
+        the others, numbered from 1.
+
+        Each check runs over a whole column, so every problem of every row
+        is reported instead of stopping at the first one. Keys of older
+        versions of the forms, such as "Categories", are accepted.
+        """
+        rows = [normalize_keys(row) for row in rows]
+        problems = self._problems(rows)
+
+        # IDs must be unique within the rows and the opened file
+        seen = set()
+        for index, row in enumerate(rows):
+            record_id = str(row.get("ID") or "")
+            if record_id and (record_id in seen or record_id in self.records):
+                problems[index].append(f"Duplicate ID: {record_id}.")
+            seen.add(record_id)
+
+        records, errors = [], []
+        for index, row in enumerate(rows):
+            if problems[index]:
+                errors.append((index + 1, " ".join(problems[index])))
+            else:
+                records.append(self.build_record(str(row.get("ID") or self.generate_id()), row))
+        return records, errors
+
+    def _problems(self, rows):
+        # The problems of each row's fields, one list per row
+        problems = [[] for _ in rows]
+
+        # Required fields must not be empty
+        required = []
+        for names, _ in self.required:
+            required.extend(name for name in names if name not in required)
+        for field in required:
+            for index, value in enumerate(row.get(field) for row in rows):
+                if not value:
+                    problems[index].append(f"{field} is required.")
+
+        # Quantity and Area must be numbers
+        for field in self.record_type.fields_of_kind("numeric"):
+            for index, value in enumerate(row.get(field) for row in rows):
+                if value and not _is_number(value):
+                    problems[index].append(f"{field} must be a number.")
+
+        # Categories must be one of the values offered in the form
+        for field, options in self.record_type.options.items():
+            allowed = set(options)
+            is_list = self.record_type.kinds[field] == "category_list"
+            for index, value in enumerate(row.get(field) for row in rows):
+                values = _category_values(value) if is_list else [value]
+                unknown = [item for item in values if item and item not in allowed]
+                if unknown:
+                    problems[index].append(f"Unknown {field}: {', '.join(unknown)}.")
+        return problems
+
+    @instrumented
+    def add_many(self, rows):
+        """
+        Validate ``rows`` with ``check_rows`` and add every valid one, writing
+        them to the opened file in a single write. Returns
+        ``(records, errors)`` like ``check_rows``.
+        """
+        records, errors = self.check_rows(rows)
+        for record in records:
+            self._insert(record)
+        if self.storage is not None and records:
+            self.storage.add_many(records)
+        if records:
+            self.history.push(("delete", [record["ID"] for record in records]))
+        count(rows=len(records))
+        return records, errors
+
+    @instrumented
+    def add(self, fields):
+        """
+        Validate ``fields``, store them as a new record with a fresh ID and
+        persist it if a file is open. Returns the new record.
+        """
+        self.validate(fields)
+        record = self.build_record(self.generate_id(), fields)
+        stored = self._insert(record)
+        if self.storage is not None:
+            self.storage.add(record)
+        self.history.push(("delete", [record["ID"]]))
+        return stored
+
+    @instrumented
+    def update(self, record_id, fields):
+        """
+        Validate ``fields`` and merge them into the record with the given ID.
+        """
+        self.validate(fields)
+        updated_fields = self.build_record(str(record_id), fields)
+        del updated_fields["ID"]
+        previous = self._change(record_id, updated_fields)
+        if previous:
+            self.history.push(("update", str(record_id), previous))
+        return self.records.get(record_id)
+
+    @instrumented
+    def delete(self, record_id):
+        """
+        Remove the record with the given ID.
+        """
+        inverse = self._remove([record_id])
+        self.history.push(inverse)
+        return inverse[1][0]
+
+    def undo(self):
+        """
+        Revert the latest add, update or delete through the same storage
+        path as any edit, so the file is never rewritten for it. Returns
+        False if there is nothing to undo.
+        """
+        if not self.history.can_undo():
+            return False
+        self.history.redo_stack.append(self._apply(self.history.undo_stack.pop()))
+        return True
+
+    def redo(self):
+        """
+        Repeat the latest undone edit. Returns False if there is nothing to
+        redo.
+        """
+        if not self.history.can_redo():
+            return False
+        self.history.undo_stack.append(self._apply(self.history.redo_stack.pop()))
+        return True
+
+    def _apply(self, operation):
+        # Apply a history operation and return its inverse
+        kind = operation[0]
+        if kind == "insert":
+            records, places = operation[1], operation[2]
+            self._restore(records, places)
+            if self.storage is not None:
+                self.storage.add_many([to_dict(record) for record in records])
+            return ("delete", [record["ID"] for record in records])
+        if kind == "delete":
+            return self._remove(operation[1])
+        record_id, fields = operation[1], operation[2]
+        return ("update", record_id, self._change(record_id, fields))
+
+    def _change(self, record_id, fields):
+        # Merge fields into a record and return the previous values of those that changed
+        old_record = dict(self.records.get(record_id) or {})
+        record = self.records.update(record_id, fields)
+        self.index.update(old_record, record)
+        self.aggregates.remove(old_record)
+        self.aggregates.add(record)
+        if self.storage is not None:
+            self.storage.update(record_id, fields)
+        return {field: old_record[field] for field in fields
+                if field in old_record and old_record[field] != record.get(field)}
+
+    def _remove(self, record_ids):
+        # Remove records and return the history operation putting them back
+        # where they were in the table and the search index
+        records, places = [], []
+        for record_id, index in zip(record_ids, self.records.indexes(record_ids)):
+            record = self.records.delete(record_id)
+            places.append((index, self.index.remove(record)))
+            self.aggregates.remove(record)
+            if self.storage is not None:
+                self.storage.delete(record_id)
+            records.append(record)
+        return ("insert", records, places)
+
+    def _restore(self, records, places):
+        stored = self.records.restore(records, [index for index, _ in places])
+        for record, (_, row) in zip(stored, places):
+            self.index.add(record, row)
+            self.aggregates.add(record)
+
+    def _insert(self, record):
+        record = self.records.add(record)
+        self.index.add(record)
+        self.aggregates.add(record)
+        return record
+
+    @instrumented
+    def export(self, path):
+        """
+        Save the records to ``path`` as JSON, a snapshot or a SQLite table,
+        depending on the file extension. Files are replaced atomically.
+
+        Saving over the opened file folds its pending edits in through the
+        storage backend instead, so the file and its journal stay in step.
+        """
+        if self.storage is not None and _same_file(path, self.path):
+            self.storage.compact(wait=True)
+            if self.loaded:
+                save_aggregates(path, self.aggregates)
+            count(rows=len(self.records), bytes=file_size(path))
+            return
+
+        records = self.records.to_list()
+        if is_snapshot(path):
+            write_snapshot(path, records, self.record_type, self.backups)
+        elif is_sqlite(path):
+            # Replace the table of this record type in the SQLite database
+            database = SQLiteStore(path, self.record_type)
+            database.import_records(records, replace=True)
+            database.close()
+        else:
+            with atomic_write(path, backups=self.backups) as json_file:
+                json.dump(records, json_file, indent=4)
+        save_aggregates(path, self.aggregates)
+        count(rows=len(records), bytes=file_size(path))
+
+    def analytics(self):
+        """
+        Return the records as a ``ColumnTable`` for vectorized analytics.
+        Needs NumPy.
+        """
+        # Imported here so NumPy does not slow down starting the app or the CLI
+        from src.data.analytics import ColumnTable
+
+        return ColumnTable.from_records(self.records, self.record_type)
+
+    def values(self, record_id):
+        """
+        Return the display values of a record, one per schema field, with
+        lists joined by commas.
+        """
+        item = self.records.get(record_id)
+        values = []
+        for field in self.record_type.fields:
+            value = item.get(field, "")
+            if isinstance(value, list):
+                value = ", ".join(value)
+            values.append(value)
+        return tuple(values)
+
+    def generate_id(self):
+        """
+        Generate a time-ordered ID that no record of the store has yet.
+        """
+        record_id = generate_id()
+        # Files may hold IDs made elsewhere, e.g. by another process at the same moment
+        while record_id in self.records:
+            record_id = generate_id()
+        return record_id
+
+
+def _category_values(value):
+    # A category list field as a list; a plain string is one value or several separated by commas
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
+
+
+def _same_file(path, other):
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return os.path.abspath(path) == os.path.abspath(other)
+
+
+def _is_number(value):
+    try:
+        return math.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+
+class WasteProfileRepository(Repository):
+    record_type = WASTE_PROFILES
+    record_class = WasteProfile
+    required = (
+        (("City", "Quantity", "Notes"), "Please fill in all fields."),
+        (("Category",), "Please select at least one category."),
+    )
+
+
+class ProtocolRepository(Repository):
+    record_type = PROTOCOLS
+    record_class = Protocol
+    required = (
+        (("City", "Area", "Frequency"), "Please fill in all fields."),
+        (("Method",), "Please select at least one method category."),
+        (("Transportation",), "Please select at least one transportation category."),
+    )
+
+
+class FacilityRepository(Repository):
+    record_type = FACILITIES
+    record_class = Facility
+    required = (
+        (("Facility Name", "Area", "Operating Hours", "Address", "Facility Type", "Disposal Methods"),
+         "Please fill in all fields."),
+    )
+
+
+REPOSITORIES = {
+    repository.record_type.name: repository
+    for repository in (WasteProfileRepository, ProtocolRepository, FacilityRepository)
+}
@@ -0,0 +1,110 @@
+class RecordType:
+    """
+    Describes the JSON layout of one kind of record.
+
+    ``kinds`` maps every field to how it is stored in columnar form:
+    "text" for free text, "category" for a single value drawn from a small
+    set, "category_list" for a list of such values and "numeric" for the
+    numbers entered as text (Quantity, Area).
+
+    ``options`` maps category fields to the values offered in the forms.
+    """
+
+    def __init__(self, name, kinds, options=None):
+        self.name = name
+        self.kinds = kinds
+        self.fields = tuple(kinds)
+        self.options = options or {}
+
+    def __repr__(self):
+        return f"RecordType({self.name!r})"
+
+    def fields_of_kind(self, kind):
+        return tuple(field for field in self.fields if self.kinds[field] == kind)
+
+
+# Values offered by the listboxes and comboboxes of the forms
+WASTE_CATEGORIES = (
+    "Municipal Solid Waste", "Recyclables", "Organic Waste", "Hazardous Waste",
+    "Construction and Demolition Waste", "Biomedical Waste", "Electronic Waste",
+    "Agricultural Waste", "Radioactive Waste", "Textile Waste", "Plastic Waste",
+    "Rubber Waste", "Glass Waste", "Wood Waste", "Metal Waste", "Paper and Cardboard Waste",
+    "Non-Recyclable Plastics",
+)
+
+COLLECTION_METHODS = (
+    "Curbside Pickup", "Container-based Collection", "Drop-off Centers",
+    "Roll-off Containers", "Compactor Trucks", "Manual Sorting Stations",
+    "Automated Sorting Systems", "Source Separation", "Specialized Collection",
+    "Mobile Collection Units",
+)
+
+TRANSPORTATION_METHODS = (
+    "Garbage Trucks", "Recycling Trucks", "Roll-off Trucks", "Front-Loaders",
+    "Rear-Loaders", "Side-Loaders", "Transfer Trucks", "Rail Transport",
+    "Barge or Ship Transport", "Pipeline Transport", "Cycling and Pedestrian Transport",
+)
+
+FACILITY_TYPES = (
+    "Landfills", "Recycling Centers", "Waste-To-Energy Plants",
+    "Composting Facilities", "Transfer Stations", "Hazardous Waste Treatment Centers",
+    "Material Recovery Facilities", "Incineration Plants", "Biogas Plants",
+    "C&D Waste Recycling Centers", "E-Waste Recycling Facilities", "Drop-off Centers",
+)
+
+DISPOSAL_METHODS = (
+    "Landfilling", "Recycling", "Incineration", "Composting", "Waste-to-Energy",
+    "Anaerobic Digestion", "Hazardous Waste Treatment", "Pyrolysis", "Shredding and Grinding",
+    "Land Application", "Reuse/Repurposing", "Deep Well Injection", "Regulated Ocean Dumping",
+)
+
+WASTE_PROFILES = RecordType("waste_profiles", {
+    "ID": "text",
+    "City": "category",
+    "Category": "category_list",
+    "Quantity": "numeric",
+    "Notes": "text",
+}, {
+    "Category": WASTE_CATEGORIES,
+})
+
+PROTOCOLS = RecordType("protocols", {
+    "ID": "text",
+    "City": "category",
+    "Area": "numeric",
+    "Frequency": "category",
+    "Method": "category_list",
+    "Transportation": "category_list",
+    "Notes": "text",
+}, {
+    "Method": COLLECTION_METHODS,
+    "Transportation": TRANSPORTATION_METHODS,
+})
+
+FACILITIES = RecordType("facilities", {
+    "ID": "text",
+    "Facility Name": "text",
+    "Area": "numeric",
+    "Operating Hours": "category",
+    "Address": "text",
+    "Facility Type": "category",
+    "Disposal Methods": "category_list",
+    "Notes": "text",
+}, {
+    "Facility Type": FACILITY_TYPES,
+    "Disposal Methods": DISPOSAL_METHODS,
+})
+
+RECORD_TYPES = {record_type.name: record_type for record_type in (WASTE_PROFILES, PROTOCOLS, FACILITIES)}
+
+
+def detect_record_type(record):
+    """
+    Guess the record type of a JSON record from its keys.
+    """
+    keys = set(record)
+    if "Facility Name" in keys or "Disposal Methods" in keys:
+        return FACILITIES
+    if "Method" in keys or "Transportation" in keys or "Frequency" in keys:
+        return PROTOCOLS
+    return WASTE_PROFILES
@@ -0,0 +1,214 @@
+import re
+from bisect import bisect_left, insort
+
+# Free-text fields searched by the search bar
+SEARCH_FIELDS = ("City", "Facility Name", "Address", "Notes")
+
+_TOKEN = re.compile(r"\w+")
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+# Positions of the set bits of every byte value, for decoding bitmaps
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """
+    Incremental search index over the records of one record type.
+
+    Every record gets a row number in insertion order. An inverted index
+    maps each word of the free-text fields to the sorted list of rows
+    containing it, and every category field keeps the rows of each of its
+    values, so edits find a row by bisection. A query
+    turns these row sets into bitmaps (Python ints, one bit per row), which
+    are cached until the data changes, so a filter over a million records
+    is a few big-integer ANDs instead of a scan of every record.
+    """
+
+    def __init__(self, record_type):
+        self.text_fields = tuple(field for field in record_type.fields if field in SEARCH_FIELDS)
+        self.facet_fields = tuple(record_type.options)
+
+        self._rows = {}
+        self._ids = []
+        self._postings = {}
+        self._facets = {field: {} for field in self.facet_fields}
+        self._vocabulary = None
+        self._bitmaps = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, record, row=None):
+        """
+        Index a newly added record, or a deleted one again in the ``row``
+        that ``remove`` returned for it.
+        """
+        record_id = str(record.get("ID"))
+        if row is None or self._ids[row] is not None:
+            row = len(self._ids)
+            self._ids.append(record_id)
+        else:
+            self._ids[row] = record_id
+        self._rows[record_id] = row
+        self._index(row, self._keys(record))
+
+    def update(self, old_record, record):
+        """
+        Re-index a record whose fields changed from ``old_record``.
+        """
+        row = self._rows[str(record.get("ID"))]
+        # Only keys the edit added or dropped move; the rest stay in place
+        old_keys = self._keys(old_record)
+        keys = self._keys(record)
+        self._unindex(row, old_keys - keys)
+        self._index(row, keys - old_keys)
+
+    def remove(self, record):
+        """
+        Drop a deleted record from the index and return its row.
+        """
+        row = self._rows.pop(str(record.get("ID")))
+        self._ids[row] = None
+        self._unindex(row, self._keys(record))
+        return row
+
+    def clear(self):
+        self._rows.clear()
+        self._ids.clear()
+        self._postings.clear()
+        for values in self._facets.values():
+            values.clear()
+        self._vocabulary = None
+        self._bitmaps.clear()
+
+    def match(self, text="", facets=None):
+        """
+        Return the bitmap of the rows matching a query, or None when the
+        query is empty. Every word of ``text`` must start a word of one of
+        the free-text fields. ``facets`` maps category fields to the
+        accepted values; a row needs one of them in every listed field.
+        """
+        result = None
+        for token in tokenize(text):
+            result = self._and(result, self._prefix_bitmap(token))
+        for field, values in (facets or {}).items():
+            if values:
+                bitmap = 0
+                for value in values:
+                    bitmap |= self._facet_bitmap(field, value)
+                result = self._and(result, bitmap)
+        return result
+
+    def matches(self, record, text="", facets=None):
+        """
+        Return whether a single record matches a query as ``match`` would,
+        without building any bitmap.
+        """
+        keys = self._keys(record)
+        words = [key for field, key in keys if field is None]
+        for token in tokenize(text):
+            if not any(word.startswith(token) for word in words):
+                return False
+        for field, values in (facets or {}).items():
+            if values and not any((field, value) in keys for value in values):
+                return False
+        return True
+
+    def ids(self, bitmap):
+        """
+        Return the record IDs of the rows set in ``bitmap``, in row order.
+        """
+        ids = self._ids
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        matches = []
+        # Let the regex engine skip the runs of empty bytes
+        for match in _NONZERO_BYTE.finditer(data):
+            offset = match.start()
+            row = offset * 8
+            for bit in _BYTE_BITS[data[offset]]:
+                matches.append(ids[row + bit])
+        return matches
+
+    def _keys(self, record):
+        # Set of (category field, value) pairs and (None, word) for the words
+        # of the free-text fields
+        keys = set()
+        for field in self.text_fields:
+            value = record.get(field)
+            if value:
+                keys.update((None, token) for token in _TOKEN.findall(str(value).lower()))
+        for field in self.facet_fields:
+            value = record.get(field)
+            for item in value if isinstance(value, list) else (value,):
+                if item:
+                    keys.add((field, item))
+        return keys
+
+    def _table(self, field):
+        return self._postings if field is None else self._facets[field]
+
+    def _index(self, row, keys):
+        for field, key in keys:
+            table = self._table(field)
+            rows = table.get(key)
+            if rows is None:
+                table[key] = [row]
+                if field is None:
+                    self._vocabulary = None
+            elif not rows or rows[-1] < row:
+                # New records get the highest row, so adding stays an append
+                rows.append(row)
+            else:
+                insort(rows, row)
+        if self._bitmaps:
+            self._bitmaps.clear()
+
+    def _unindex(self, row, keys):
+        for field, key in keys:
+            rows = self._table(field).get(key)
+            if rows:
+                index = bisect_left(rows, row)
+                if index < len(rows) and rows[index] == row:
+                    del rows[index]
+        if self._bitmaps:
+            self._bitmaps.clear()
+
+    def _prefix_bitmap(self, prefix):
+        key = ("prefix", prefix)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._postings)
+            vocabulary = self._vocabulary
+
+            # Words sharing the prefix are adjacent in the sorted vocabulary
+            row_sets = []
+            index = bisect_left(vocabulary, prefix)
+            while index < len(vocabulary) and vocabulary[index].startswith(prefix):
+                row_sets.append(self._postings[vocabulary[index]])
+                index += 1
+            bitmap = self._bitmaps[key] = self._to_bitmap(row_sets)
+        return bitmap
+
+    def _facet_bitmap(self, field, value):
+        key = (field, value)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            rows = self._facets.get(field, {}).get(value)
+            bitmap = self._bitmaps[key] = self._to_bitmap([rows] if rows else [])
+        return bitmap
+
+    def _to_bitmap(self, row_sets):
+        data = bytearray(len(self._ids) // 8 + 1)
+        for rows in row_sets:
+            for row in rows:
+                data[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(data, "little")
+
+    @staticmethod
+    def _and(result, bitmap):
+        return bitmap if result is None else result & bitmap
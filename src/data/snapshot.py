@@ -0,0 +1,354 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from src.data.atomic import atomic_write
+from src.data.schema import RECORD_TYPES, detect_record_type
+
+MAGIC = b"SDGSNAP1"
+SNAPSHOT_EXTENSION = ".sdgs"
+
+# Flags telling how a numeric value was written in the JSON record
+_INT_TEXT, _FLOAT_TEXT, _JSON_INT, _JSON_FLOAT = range(4)
+_MAX_EXACT_INT = 2 ** 53
+
+# Category lists are written as uint64 bitmasks while they use at most this many values
+_MASK_BITS = 64
+
+
+class _Column:
+    """
+    Accumulates the buffers of one column while a snapshot is written.
+    """
+
+    def __init__(self, kind, options=()):
+        self.kind = kind
+        self.dictionary = {}
+        self.masks = None
+        if kind == "text":
+            self.buffers = {"offsets": array("Q", [0]), "data": bytearray()}
+        elif kind == "category":
+            self.buffers = {"codes": array("I")}
+        elif kind == "category_list":
+            self.buffers = {"offsets": array("I", [0]), "codes": array("I")}
+            self.masks = array("Q")
+        else:
+            self.buffers = {"values": array("d"), "flags": array("B")}
+
+        # Option codes come first, so lists in option order have ascending codes
+        for option in options:
+            self.code(option)
+
+    def code(self, value):
+        code = self.dictionary.get(value)
+        if code is None:
+            code = self.dictionary[value] = len(self.dictionary)
+        return code
+
+    def append(self, value):
+        buffers = self.buffers
+        if self.kind == "text":
+            buffers["data"] += value.encode("utf-8")
+            buffers["offsets"].append(len(buffers["data"]))
+        elif self.kind == "category":
+            buffers["codes"].append(self.code(value))
+        elif self.kind == "category_list":
+            codes = [self.code(item) for item in value]
+            buffers["codes"].extend(codes)
+            buffers["offsets"].append(len(buffers["codes"]))
+            if self.masks is not None:
+                self._append_mask(codes)
+        else:
+            number, flag = value
+            buffers["values"].append(number)
+            buffers["flags"].append(flag)
+
+    def append_placeholder(self):
+        placeholders = {"text": "", "category": "", "category_list": [], "numeric": (0.0, _INT_TEXT)}
+        self.append(placeholders[self.kind])
+
+    def finish(self):
+        # Keep only the bitmasks if every list could be written as one
+        if self.masks is not None:
+            self.buffers = {"masks": self.masks}
+        return self.buffers
+
+    def _append_mask(self, codes):
+        # A bitmask only rebuilds lists in ascending code order without repeats
+        mask = 0
+        previous = -1
+        for code in codes:
+            if code <= previous or code >= _MASK_BITS:
+                self.masks = None
+                return
+            mask |= 1 << code
+            previous = code
+        self.masks.append(mask)
+
+
+def _encode_number(value):
+    # Return (float, flag) if the value can be rebuilt exactly, else None
+    if isinstance(value, str):
+        try:
+            number = int(value)
+            if str(number) == value and abs(number) < _MAX_EXACT_INT:
+                return float(number), _INT_TEXT
+        except ValueError:
+            pass
+        try:
+            number = float(value)
+            if repr(number) == value:
+                return number, _FLOAT_TEXT
+        except ValueError:
+            pass
+    elif type(value) is int and abs(value) < _MAX_EXACT_INT:
+        return float(value), _JSON_INT
+    elif type(value) is float:
+        return value, _JSON_FLOAT
+    return None
+
+
+def _decode_number(number, flag):
+    if flag == _INT_TEXT:
+        return str(int(number))
+    if flag == _FLOAT_TEXT:
+        return repr(number)
+    if flag == _JSON_INT:
+        return int(number)
+    return number
+
+
+def _encode_record(record, record_type):
+    # Return the column values of a record, or None if it does not fit the schema
+    if list(record) != list(record_type.fields):
+        return None
+
+    values = []
+    for field in record_type.fields:
+        kind = record_type.kinds[field]
+        value = record[field]
+        if kind in ("text", "category"):
+            if not isinstance(value, str):
+                return None
+        elif kind == "category_list":
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return None
+        else:
+            value = _encode_number(value)
+            if value is None:
+                return None
+        values.append(value)
+    return values
+
+
+def write_snapshot(path, records, record_type=None, backups=0):
+    """
+    Atomically write ``records`` to ``path`` in the columnar snapshot
+    format and return the number of rows written, keeping ``backups``
+    copies of the replaced file.
+
+    Numeric fields become float64 columns, single-valued categories become
+    dictionary-encoded uint32 codes and category lists become uint64
+    bitmasks over the option codes, or code lists if some list is out of
+    option order or the field has more than 64 distinct values.
+    Records that do not match the schema exactly (extra keys, odd types,
+    numbers whose text would not round-trip) are kept verbatim as JSON, so
+    converting back yields the same records.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if record_type is None:
+        record_type = detect_record_type(first) if first is not None else RECORD_TYPES["waste_profiles"]
+
+    columns = {field: _Column(record_type.kinds[field], record_type.options.get(field, ()))
+               for field in record_type.fields}
+    overflow = {}
+    rows = 0
+
+    pending = [first] if first is not None else []
+    for stream in (pending, records):
+        for record in stream:
+            values = _encode_record(record, record_type)
+            if values is None:
+                overflow[str(rows)] = json.dumps(record)
+                for column in columns.values():
+                    column.append_placeholder()
+            else:
+                for field, value in zip(record_type.fields, values):
+                    columns[field].append(value)
+            rows += 1
+
+    # Lay the buffers out back to back, each aligned to 8 bytes
+    header = {
+        "record_type": record_type.name,
+        "rows": rows,
+        "byteorder": sys.byteorder,
+        "columns": {},
+        "overflow": overflow,
+    }
+    blobs = []
+    position = 0
+    for field, column in columns.items():
+        layout = {}
+        for name, buffer in column.finish().items():
+            data = bytes(buffer)
+            typecode = buffer.typecode if isinstance(buffer, array) else "B"
+            layout[name] = [position, len(data), typecode]
+            padding = -len(data) % 8
+            blobs.append(data + b"\0" * padding)
+            position += len(data) + padding
+        header["columns"][field] = {
+            "kind": column.kind,
+            "buffers": layout,
+            "dictionary": list(column.dictionary),
+        }
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % 8)
+
+    with atomic_write(path, "wb", backups) as snapshot_file:
+        snapshot_file.write(MAGIC)
+        snapshot_file.write(struct.pack("<I", len(header_bytes)))
+        snapshot_file.write(header_bytes)
+        for blob in blobs:
+            snapshot_file.write(blob)
+    return rows
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file, memory-mapped on open.
+
+    Opening only parses the small header; column buffers are exposed as
+    memoryviews over the mapping, so numeric and category columns can be
+    scanned without building any Python objects per row. Iterating yields
+    the records as the same dicts the JSON file would hold, which costs
+    about as much as parsing the JSON file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+
+        view = self._track(memoryview(self._mmap))
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file")
+
+        header_length = struct.unpack_from("<I", self._mmap, len(MAGIC))[0]
+        data_start = len(MAGIC) + 4 + header_length
+        header = json.loads(bytes(view[len(MAGIC) + 4:data_start]).decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+
+        self.record_type = RECORD_TYPES[header["record_type"]]
+        self.rows = header["rows"]
+        self.rows_read = 0
+        self._overflow = {int(row): text for row, text in header["overflow"].items()}
+
+        self._columns = {}
+        for field, column in header["columns"].items():
+            buffers = {}
+            for name, (offset, length, typecode) in column["buffers"].items():
+                start = data_start + offset
+                buffers[name] = self._track(view[start:start + length].cast(typecode))
+            self._columns[field] = (column["kind"], buffers, column["dictionary"])
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self.record(row)
+            self.rows_read = row + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def progress(self):
+        return self.rows_read / self.rows if self.rows else None
+
+    def column(self, field):
+        """
+        Return the raw buffer of a column: float64 values for numeric
+        columns, uint32 dictionary codes for category columns.
+        """
+        kind, buffers, _ = self._columns[field]
+        return buffers["values"] if kind == "numeric" else buffers["codes"]
+
+    def offsets(self, field):
+        """
+        Return the uint32 offsets of a category list column: the codes of
+        row ``i`` are ``column(field)[offsets[i]:offsets[i + 1]]``.
+        """
+        return self._columns[field][1]["offsets"]
+
+    def masks(self, field):
+        """
+        Return the uint64 bitmasks of a category list column written as
+        bitmasks (bit ``n`` stands for dictionary value ``n``), or None if
+        it was written as code lists.
+        """
+        return self._columns[field][1].get("masks")
+
+    def overflow_rows(self):
+        """
+        Return the rows kept verbatim as JSON; their column slots only hold
+        placeholders.
+        """
+        return sorted(self._overflow)
+
+    def dictionary(self, field):
+        """
+        Return the list of distinct values the codes of a column refer to.
+        """
+        return self._columns[field][2]
+
+    def record(self, row):
+        """
+        Rebuild the JSON record stored at ``row``.
+        """
+        text = self._overflow.get(row)
+        if text is not None:
+            return json.loads(text)
+
+        record = {}
+        for field, (kind, buffers, dictionary) in self._columns.items():
+            if kind == "text":
+                offsets = buffers["offsets"]
+                record[field] = bytes(buffers["data"][offsets[row]:offsets[row + 1]]).decode("utf-8")
+            elif kind == "category":
+                record[field] = dictionary[buffers["codes"][row]]
+            elif kind == "category_list" and "masks" in buffers:
+                mask = buffers["masks"][row]
+                record[field] = [value for bit, value in enumerate(dictionary) if mask >> bit & 1]
+            elif kind == "category_list":
+                offsets = buffers["offsets"]
+                codes = buffers["codes"][offsets[row]:offsets[row + 1]]
+                record[field] = [dictionary[code] for code in codes]
+            else:
+                record[field] = _decode_number(buffers["values"][row], buffers["flags"][row])
+        return record
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def _track(self, view):
+        self._views.append(view)
+        return view
+
+
+def is_snapshot(path):
+    return path.lower().endswith(SNAPSHOT_EXTENSION)
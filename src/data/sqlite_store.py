@@ -0,0 +1,212 @@
+import json
+import os
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+from src.data.records import normalize_keys
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def is_sqlite(path):
+    return path.lower().endswith(SQLITE_EXTENSIONS)
+
+
+def _column(field):
+    return field.lower().replace(" ", "_")
+
+
+class SQLiteStore:
+    """
+    Embedded SQLite backend for one record type.
+
+    Each record type gets its own table, one column per field plus an
+    insertion ``position``, with a unique index on ID for updates and
+    deletes. Searching and filtering happen on the loaded records, so no
+    other column is indexed. Adds, updates and deletes are single-row
+    transactions. Records that do not fit the schema are kept as JSON in a
+    ``raw`` column and read back under the schema field names, as the
+    other backends do.
+
+    The store exposes the same ``add``/``update``/``delete``/``iter_records``
+    interface as ``JournalStore``, so the frames can use either one. A
+    ``read_only`` store opens the database without creating or changing it.
+    """
+
+    def __init__(self, path, record_type, read_only=False):
+        self.path = path
+        self.record_type = record_type
+        self.table = record_type.name
+        self.list_fields = record_type.fields_of_kind("category_list")
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        self._connection = self._connect(check_same_thread=False)
+        self._rows_read = 0
+        self._rows_total = None
+        if not read_only:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._create_schema()
+
+    def _connect(self, **options):
+        if self.read_only:
+            uri = "file:" + pathname2url(os.path.abspath(self.path)) + "?mode=ro"
+            return sqlite3.connect(uri, uri=True, **options)
+        return sqlite3.connect(self.path, **options)
+
+    def _has_table(self, connection):
+        # A read-only store does not create the table of an empty database
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        return connection.execute(query, (self.table,)).fetchone() is not None
+
+    def _create_schema(self):
+        columns = ", ".join(f'"{_column(field)}"' for field in self.record_type.fields if field != "ID")
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"position INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, {columns}, raw TEXT)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def add(self, record):
+        """
+        Insert one record in its own transaction.
+        """
+        with self._lock, self._connection:
+            self._insert(self._connection, record)
+
+    def add_many(self, records):
+        """
+        Insert many records in a single transaction.
+        """
+        return self.import_records(records)
+
+    def update(self, record_id, fields):
+        """
+        Merge ``fields`` into the record with the given ID.
+        """
+        record_id = str(record_id)
+        with self._lock, self._connection:
+            row = self._connection.execute(f"SELECT * FROM {self.table} WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return
+            record = self._to_record(row)
+            record.update(fields)
+
+            # Rewrite the row in place, keeping its insertion position
+            self._delete(self._connection, record_id)
+            self._insert(self._connection, record, position=row[0])
+
+    def delete(self, record_id):
+        """
+        Delete the record with the given ID.
+        """
+        with self._lock, self._connection:
+            self._delete(self._connection, str(record_id))
+
+    def iter_records(self, batch_size=1000):
+        """
+        Yield every record in insertion order.
+
+        Reads go through their own connection inside one transaction, so
+        the records reflect the database when iteration started even if
+        edits are written meanwhile.
+        """
+        connection = self._connect()
+        try:
+            if not self._has_table(connection):
+                return
+            connection.execute("BEGIN")
+            self._rows_read = 0
+            self._rows_total = connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            cursor = connection.execute(f"SELECT * FROM {self.table} ORDER BY position")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._to_record(row)
+                self._rows_read += len(rows)
+        finally:
+            connection.close()
+
+    def progress(self):
+        if not self._rows_total:
+            return None
+        return self._rows_read / self._rows_total
+
+    def import_records(self, records, replace=False):
+        """
+        Insert many records in a single transaction and return how many were
+        inserted. With ``replace=True`` the existing records are removed first.
+        """
+        with self._lock, self._connection:
+            if replace:
+                self._connection.execute(f"DELETE FROM {self.table}")
+            count = 0
+            for record in records:
+                self._insert(self._connection, record)
+                count += 1
+        return count
+
+    def compact(self, wait=False):
+        # Every edit is already committed; nothing to fold back
+        pass
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _fits(self, record):
+        if list(record) != list(self.record_type.fields):
+            return False
+        for field in self.record_type.fields:
+            value = record[field]
+            kind = self.record_type.kinds[field]
+            if kind == "category_list":
+                if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                    return False
+            elif kind == "numeric":
+                if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+                    return False
+            elif not isinstance(value, str):
+                return False
+        return True
+
+    def _insert(self, connection, record, position=None):
+        record_id = str(record.get("ID"))
+        fields = [field for field in self.record_type.fields if field != "ID"]
+
+        if self._fits(record):
+            values = [json.dumps(record[field]) if field in self.list_fields else record[field] for field in fields]
+            raw = None
+        else:
+            values = [None] * len(fields)
+            raw = json.dumps(record)
+
+        columns = ", ".join(f'"{_column(field)}"' for field in fields)
+        placeholders = ", ".join("?" for _ in fields)
+        connection.execute(
+            f"INSERT INTO {self.table} (position, id, {columns}, raw) VALUES (?, ?, {placeholders}, ?)",
+            [position, record_id] + values + [raw],
+        )
+
+    def _delete(self, connection, record_id):
+        connection.execute(f"DELETE FROM {self.table} WHERE id = ?", (record_id,))
+
+    def _to_record(self, row):
+        # Columns: position, id, <fields except ID>, raw
+        raw = row[-1]
+        if raw is not None:
+            # Raw records may use the keys of older forms
+            return normalize_keys(json.loads(raw))
+
+        record = {"ID": row[1]}
+        fields = [field for field in self.record_type.fields if field != "ID"]
+        for field, value in zip(fields, row[2:-1]):
+            record[field] = json.loads(value) if field in self.list_fields else value
+        return record
@@ -0,0 +1,19 @@
+import sqlite3
+
+from src.data.journal import JournalStore
+from src.data.sqlite_store import SQLiteStore, is_sqlite
+
+# What the storage backends raise for a file they cannot read or write
+STORAGE_ERRORS = (OSError, ValueError, sqlite3.Error)
+
+
+def open_storage(path, record_type, backups=0, read_only=False):
+    """
+    Return the storage backend for a data file: ``SQLiteStore`` for SQLite
+    databases, otherwise a ``JournalStore`` over the JSON or snapshot file
+    that keeps ``backups`` copies when it rewrites the file. A ``read_only``
+    backend never changes the file.
+    """
+    if is_sqlite(path):
+        return SQLiteStore(path, record_type, read_only=read_only)
+    return JournalStore(path, record_type=record_type, backups=backups, read_only=read_only)
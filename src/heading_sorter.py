@@ -0,0 +1,58 @@
+class HeadingSorter:
+    """
+    Click-to-sort behaviour for the column headings of a ``ttk.Treeview``.
+
+    Clicking a heading sorts by that column, clicking it again reverses the
+    direction. Shift-clicking adds the column as a further sort key (or
+    reverses it if it is already one). ``order`` holds the current sort
+    keys as ``(field, descending)`` pairs and ``on_change`` is called after
+    every change; the sorting itself is left to the record store.
+    """
+
+    def __init__(self, tree, fields, on_change):
+        self.tree = tree
+        self.fields = fields
+        self.on_change = on_change
+        self.order = []
+
+        # Remember the heading texts so the sort arrows can be added to them
+        self.columns = tree["columns"]
+        self.texts = {column: tree.heading(column, "text") for column in self.columns}
+
+        self.tree.bind("<Button-1>", self.on_click, add="+")
+
+    def on_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return
+
+        # Column identifiers look like "#1" for the first displayed column
+        index = int(self.tree.identify_column(event.x)[1:]) - 1
+        if not 0 <= index < len(self.fields):
+            return
+        field = self.fields[index]
+
+        shift = event.state & 0x0001
+        keys = dict(self.order)
+        if shift and field in keys:
+            self.order = [(name, not descending if name == field else descending) for name, descending in self.order]
+        elif shift:
+            self.order.append((field, False))
+        elif self.order == [(field, False)]:
+            self.order = [(field, True)]
+        else:
+            self.order = [(field, False)]
+
+        self.update_headings()
+        self.on_change()
+
+    def update_headings(self):
+        # Show an arrow per sort key, numbered when sorting by several columns
+        keys = {field: (position, descending) for position, (field, descending) in enumerate(self.order, 1)}
+        for column, field in zip(self.columns, self.fields):
+            text = self.texts[column]
+            if field in keys:
+                position, descending = keys[field]
+                text += " ▼" if descending else " ▲"
+                if len(self.order) > 1:
+                    text += str(position)
+            self.tree.heading(column, text=text)
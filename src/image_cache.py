@@ -0,0 +1,16 @@
+from tkinter import PhotoImage
+
+# Decoded images by file path, shared by every widget of the process
+_images = {}
+
+
+def load_image(path):
+    """
+    Return the ``PhotoImage`` of an image file, reading and decoding it
+    only the first time. The cache also keeps a reference to every image,
+    so Tk never drops one that a widget still shows.
+    """
+    image = _images.get(path)
+    if image is None:
+        image = _images[path] = PhotoImage(file=path)
+    return image
@@ -0,0 +1,255 @@
+import argparse
+import itertools
+import os
+import sys
+
+from src.data.atomic import atomic_write
+from src.data.formats import read_records, write_records
+from src.data.journal import JournalStore
+from src.data.metrics import FOLDED_SUFFIX, count, enable, enable_from_environment, file_size, span
+from src.data.reports import aggregate, load_aggregates
+from src.data.repositories import REPOSITORIES
+from src.data.sqlite_store import SQLiteStore, is_sqlite
+
+# Rows validated at once; large enough for the column checks, small enough to stream
+CHECK_CHUNK_SIZE = 10000
+
+
+def main(argv=None):
+    """
+    Entry point of the ``sdgpy`` console script. Without a command the
+    Tkinter application is started.
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    enable_from_environment()
+    if args.metrics:
+        enable(args.metrics)
+    if args.command is None:
+        return run_app()
+    try:
+        with span(f"sdgpy.{args.command}"):
+            return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog="sdgpy", description="Waste management data tool.")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record timings, rows and bytes and write them to PATH as JSON "
+                             f"and to PATH{FOLDED_SUFFIX} as folded stacks for flamegraph tools")
+    subparsers = parser.add_subparsers(dest="command")
+    record_types = sorted(REPOSITORIES)
+
+    # sdgpy import <type> <source> <target>
+    import_parser = subparsers.add_parser(
+        "import", help="Import CSV or JSON Lines rows into a data file.",
+        description="Validate the rows of SOURCE and append them to TARGET (.json, .sdgs or SQLite). "
+                    "Invalid rows and duplicate IDs are reported and skipped.")
+    import_parser.add_argument("record_type", choices=record_types)
+    import_parser.add_argument("source", help="CSV, JSON Lines or JSON file to import")
+    import_parser.add_argument("target", help="data file to import into; created if missing")
+    import_parser.add_argument("--replace", action="store_true", help="drop the existing records of TARGET first")
+    import_parser.add_argument("--backups", type=int, default=0, metavar="N",
+                               help="keep N rotating backups of TARGET (TARGET.1.bak is the newest)")
+    import_parser.set_defaults(handler=import_command)
+
+    # sdgpy export <type> <source> <target>
+    export_parser = subparsers.add_parser(
+        "export", help="Export a data file to JSON, JSON Lines or CSV.",
+        description="Stream the records of SOURCE into TARGET; the format follows the extension of TARGET.")
+    export_parser.add_argument("record_type", choices=record_types)
+    export_parser.add_argument("source", help="data file to export")
+    export_parser.add_argument("target", help=".json, .jsonl or .csv file to write")
+    export_parser.add_argument("--backups", type=int, default=0, metavar="N",
+                               help="keep N rotating backups of TARGET (TARGET.1.bak is the newest)")
+    export_parser.set_defaults(handler=export_command)
+
+    # sdgpy validate <type> <source>
+    validate_parser = subparsers.add_parser(
+        "validate", help="Check the records of a file without writing anything.",
+        description="Report every invalid record and duplicate ID of SOURCE.")
+    validate_parser.add_argument("record_type", choices=record_types)
+    validate_parser.add_argument("source", help="CSV, JSON Lines, JSON, snapshot or SQLite file")
+    validate_parser.set_defaults(handler=validate_command)
+
+    # sdgpy report <type> <source> [--output PATH]
+    report_parser = subparsers.add_parser(
+        "report", help="Summarize a data file.",
+        description="Aggregate the records of SOURCE in a single streaming pass and print the totals.")
+    report_parser.add_argument("record_type", choices=record_types)
+    report_parser.add_argument("source", help="CSV, JSON Lines, JSON, snapshot or SQLite file")
+    report_parser.add_argument("--output", help="write the report to this file instead of printing it")
+    report_parser.set_defaults(handler=report_command)
+
+    # sdgpy analytics <type> <source> [--by FIELD]
+    analytics_parser = subparsers.add_parser(
+        "analytics", help="Print statistics of a data file (needs NumPy).",
+        description="Load the numeric and category columns of SOURCE and print summary statistics, "
+                    "percentiles, totals per category and outliers.")
+    analytics_parser.add_argument("record_type", choices=record_types)
+    analytics_parser.add_argument("source", help="CSV, JSON Lines, JSON, snapshot or SQLite file")
+    analytics_parser.add_argument("--by", metavar="FIELD",
+                                  help="category field to total by; defaults to the first one with form options")
+    analytics_parser.set_defaults(handler=analytics_command)
+    return parser
+
+
+def run_app():
+    # Import Tkinter lazily so the batch commands work without a display
+    import tkinter as tk
+    from src.app import WasteManagementApp
+
+    root = tk.Tk()
+    WasteManagementApp(root)
+    root.mainloop()
+    return 0
+
+
+def import_command(args):
+    repository = REPOSITORIES[args.record_type]()
+    record_type = repository.record_type
+    rows = read_records(args.source, record_type)
+    seen = set()
+    stats = {"valid": 0, "invalid": 0}
+    rekeyed = []
+
+    if is_sqlite(args.target):
+        database = SQLiteStore(args.target, record_type)
+        try:
+            if not args.replace:
+                seen.update(record["ID"] for record in database.iter_records())
+            database.import_records(valid_records(repository, rows, args.source, seen, stats), replace=args.replace)
+        finally:
+            database.close()
+    else:
+        existing = ()
+        store = None
+        if os.path.exists(args.target) and not args.replace:
+            # Fold pending journal entries into the target before rewriting it
+            store = JournalStore(args.target, record_type=record_type)
+            store.close()
+            rekeyed.extend(store.rekeyed)
+            existing = track_ids(store.iter_records(), seen)
+
+        # The target is only swapped for the new file once everything is written
+        write_records(args.target, itertools.chain(
+            existing, valid_records(repository, rows, args.source, seen, stats)), record_type, args.backups)
+        if store is not None:
+            rekeyed.extend(store.rekeyed)
+
+    count(rows=stats["valid"], bytes=file_size(args.target))
+    if rekeyed:
+        examples = ", ".join(f"{old} -> {new}" for old, new in rekeyed[:5])
+        print(f"{args.target}: {len(rekeyed)} records had a missing or duplicate ID and were given a new one "
+              f"({examples}).", file=sys.stderr)
+    print(f"Imported {stats['valid']} records into {args.target}, skipped {stats['invalid']} invalid rows.")
+    return 1 if stats["invalid"] else 0
+
+
+def export_command(args):
+    record_type = REPOSITORIES[args.record_type].record_type
+    exported = write_records(args.target, read_records(args.source, record_type), record_type, args.backups)
+    count(rows=exported, bytes=file_size(args.target))
+    print(f"Exported {exported} records to {args.target}.")
+    return 0
+
+
+def validate_command(args):
+    repository = REPOSITORIES[args.record_type]()
+    stats = {"valid": 0, "invalid": 0}
+    for _ in valid_records(repository, read_records(args.source, repository.record_type), args.source, set(), stats):
+        pass
+    print(f"{args.source}: {stats['valid']} valid records, {stats['invalid']} invalid.")
+    return 1 if stats["invalid"] else 0
+
+
+def report_command(args):
+    record_type = REPOSITORIES[args.record_type].record_type
+    report = load_aggregates(args.source, record_type) or aggregate(read_records(args.source, record_type), record_type)
+    report = report.format()
+    if args.output:
+        with atomic_write(args.output) as report_file:
+            report_file.write(report)
+        print(f"Report saved to {args.output}.")
+    else:
+        print(report)
+    return 0
+
+
+def analytics_command(args):
+    # Imported here so the other commands work without NumPy
+    from src.data.analytics import ColumnTable
+
+    record_type = REPOSITORIES[args.record_type].record_type
+    field = args.by or next(iter(record_type.options))
+    if field not in record_type.fields_of_kind("category") + record_type.fields_of_kind("category_list"):
+        raise ValueError(f"{field} is not a category field of {record_type.name}.")
+    try:
+        table = ColumnTable.from_file(args.source, record_type)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    summary = table.summary()
+    amount = table.amount_field
+    print(f"Records: {summary['records']}, {summary['numeric']} with a numeric {amount}")
+    if summary["numeric"]:
+        print(f"{amount}: sum {summary['sum']:.2f}, mean {summary['mean']:.2f}, std {summary['std']:.2f}, "
+              f"min {summary['min']:.2f}, max {summary['max']:.2f}")
+        percentiles = ", ".join(f"{percent}%: {value:.2f}" for percent, value in table.percentiles().items())
+        print(f"Percentiles: {percentiles}")
+    print(f"{amount} by {field}:")
+    for value, total in sorted(table.group_sums(field).items(), key=lambda item: -item[1]):
+        print(f"  {value}: {total:.2f}")
+    outliers = table.outlier_ids()
+    print(f"Outliers: {', '.join(str(record_id) for record_id in outliers) if outliers else 'none'}")
+    return 0
+
+
+def valid_records(repository, rows, source, seen, stats):
+    """
+    Yield the rows that pass validation as records, reporting the others on
+    stderr. The rows are checked in chunks with ``Repository.check_rows``,
+    the same checks as the Batch Add dialog. IDs already in ``seen`` count
+    as duplicates; new IDs are added.
+    """
+    rows = iter(rows)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(rows, CHECK_CHUNK_SIZE))
+        if not chunk:
+            return
+        records, errors = repository.check_rows(chunk)
+        rejected = set()
+        for number, message in errors:
+            rejected.add(number)
+            report(source, start + number, message, stats)
+
+        valid_numbers = (start + number for number in range(1, len(chunk) + 1) if number not in rejected)
+        for number, record in zip(valid_numbers, records):
+            if record["ID"] in seen:
+                report(source, number, f"Duplicate ID: {record['ID']}.", stats)
+                continue
+            seen.add(record["ID"])
+            stats["valid"] += 1
+            yield record
+        start += len(chunk)
+
+
+def track_ids(records, seen):
+    # Remember the IDs of the records passing through
+    for record in records:
+        seen.add(str(record.get("ID")))
+        yield record
+
+
+def report(source, number, message, stats):
+    stats["invalid"] += 1
+    print(f"{source}: record {number}: {message}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
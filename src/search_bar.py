@@ -0,0 +1,48 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class SearchBar(ttk.Frame):
+    """
+    Search entry and category filters shown above a record table.
+
+    ``on_change`` is called without arguments whenever the query changes;
+    ``query()`` returns the text and the selected category values in the
+    form ``Repository.find`` expects.
+    """
+
+    def __init__(self, master, record_type, on_change):
+        super().__init__(master)
+        self.on_change = on_change
+
+        # Free-text search over the text fields
+        search_label = ttk.Label(self, text="Search:")
+        search_label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.search_entry = ttk.Entry(self, width=30)
+        self.search_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        self.search_entry.bind("<KeyRelease>", self.changed)
+
+        # One filter per category field, defaulting to any value
+        self.facet_menus = {}
+        for column, (field, options) in enumerate(record_type.options.items(), 2):
+            menu = ttk.Combobox(self, values=[f"Any {field}"] + list(options), state="readonly", width=24)
+            menu.current(0)
+            menu.grid(row=0, column=column, padx=5, pady=5, sticky="w")
+            menu.bind("<<ComboboxSelected>>", self.changed)
+            self.facet_menus[field] = menu
+
+        clear_button = ttk.Button(self, text="Clear Search", command=self.clear)
+        clear_button.grid(row=0, column=len(self.facet_menus) + 2, padx=5, pady=5, sticky="w")
+
+    def query(self):
+        facets = {field: {menu.get()} for field, menu in self.facet_menus.items() if menu.current() > 0}
+        return self.search_entry.get(), facets
+
+    def clear(self):
+        self.search_entry.delete(0, tk.END)
+        for menu in self.facet_menus.values():
+            menu.current(0)
+        self.on_change()
+
+    def changed(self, event=None):
+        self.on_change()
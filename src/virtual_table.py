@@ -0,0 +1,151 @@
+from src.data.metrics import instrumented
+
+
+class VirtualTable:
+    """
+    Virtual row mode for a ``ttk.Treeview``.
+
+    Instead of inserting one Treeview item per record, the table keeps a
+    sequence of record IDs and only materializes the visible window of rows
+    plus a small buffer. The vertical scrollbar drives the window, so the
+    number of Tk items stays constant no matter how large the dataset is.
+    Rows use the record ID as their item ID, so ``table_view.selection()``
+    keeps returning something the frames can look up in their record store.
+    """
+
+    def __init__(self, tree, scrollbar, to_values, buffer=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.to_values = to_values
+        self.buffer = buffer
+
+        self.rows = []
+        self.first = 0
+        self.selected_id = None
+
+        # Whether self.rows is a list of our own that append_rows may extend
+        self._owns_rows = True
+
+        # Route scrolling through the virtual window instead of the Treeview
+        self.scrollbar.config(command=self.yview)
+        self.tree.config(yscrollcommand=self.on_tree_scroll)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", self.on_mouse_wheel)
+        self.tree.bind("<Button-5>", self.on_mouse_wheel)
+        self.tree.bind("<Up>", self.on_key_up)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+
+    @property
+    def height(self):
+        return int(self.tree.cget("height"))
+
+    def set_rows(self, rows, keep_position=True):
+        """
+        Show the given sequence of record IDs. The scroll position is kept
+        unless ``keep_position`` is False.
+        """
+        self.rows = rows
+        self._owns_rows = False
+        if not keep_position:
+            self.first = 0
+            self.selected_id = None
+        self.refresh()
+
+    def append_rows(self, rows):
+        """
+        Add record IDs after the shown ones, e.g. while a file is loading,
+        without rebuilding the whole sequence.
+        """
+        if not rows:
+            return
+        if not self._owns_rows:
+            # The sequence may be shared, e.g. a cached sort order of the record store
+            self.rows = list(self.rows)
+            self._owns_rows = True
+        start = len(self.rows)
+        self.rows.extend(rows)
+        if start < self.first + self.height + self.buffer:
+            self.refresh()
+        else:
+            self.update_scrollbar()
+
+    @instrumented
+    def refresh(self):
+        """
+        Re-render the visible window of rows.
+        """
+        max_first = max(len(self.rows) - self.height, 0)
+        self.first = min(max(self.first, 0), max_first)
+
+        window = self.rows[self.first:self.first + self.height + self.buffer]
+
+        self.tree.delete(*self.tree.get_children())
+        for record_id in window:
+            self.tree.insert("", "end", iid=record_id, values=self.to_values(record_id))
+        self.tree.yview_moveto(0)
+
+        # Keep the selection if the selected row is still on screen
+        if self.selected_id is not None and self.tree.exists(self.selected_id):
+            self.tree.selection_set(self.selected_id)
+            self.tree.focus(self.selected_id)
+
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + self.height) / total)
+
+    def scroll_to(self, first):
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def yview(self, *args):
+        # Scrollbar callback: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.height
+            self.scroll_to(self.first + step)
+
+    def on_tree_scroll(self, first, last):
+        # Keyboard navigation into the buffer scrolls the Treeview itself;
+        # shift the virtual window by the same number of rows instead
+        children = self.tree.get_children()
+        offset = round(float(first) * len(children))
+        if offset > 0:
+            self.on_select(None)
+            self.first += offset
+            self.refresh()
+        else:
+            self.update_scrollbar()
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+
+    def on_key_up(self, event):
+        # Page in the row above when moving up from the first rendered row
+        focus = self.tree.focus()
+        children = self.tree.get_children()
+        if self.first > 0 and children and focus == children[0]:
+            self.scroll_to(self.first - 1)
+            record_id = self.rows[self.first]
+            self.tree.selection_set(record_id)
+            self.tree.focus(record_id)
+            return "break"
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = selection[0]
@@ -1,12 +1,25 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
-import uuid
+from src.data.autosave import AUTOSAVE_DELAY
+from src.data.repositories import ProtocolRepository, ValidationError
+from src.data.schema import COLLECTION_METHODS, TRANSPORTATION_METHODS
+from src.data.storage import STORAGE_ERRORS
+from src.virtual_table import VirtualTable
+from src.background_loader import BackgroundLoader
+from src.batch_add import BatchAddDialog
+from src.search_bar import SearchBar
+from src.heading_sorter import HeadingSorter
 
 class WasteCatFrame(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master)
 
+        # Headless access to the records and storage of the opened file
+        self.repository = ProtocolRepository()
+
+        # Write edits on a background thread once data entry pauses
+        self.repository.autosave_delay = AUTOSAVE_DELAY
+
         # Create the main components for the scrollable frame
         self.canvas = tk.Canvas(self)
         self.scrollbar_y = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
@@ -26,9 +39,6 @@ class WasteCatFrame(tk.Frame):
         self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
         self.canvas.bind("<Configure>", self.on_canvas_configure)
 
-        # Create the tree view
-        self.create_tree_view()
-
         # Disable the Save button by default
         self.save_button.config(state=tk.DISABLED)
 
@@ -53,6 +63,13 @@ class WasteCatFrame(tk.Frame):
         # Bind the Treeview to the item selection event
         self.table_view.bind("<ButtonRelease-1>", self.on_table_click)
 
+        # Only materialize the visible rows of the record store
+        self.virtual_table = VirtualTable(self.table_view, table_scrollbar_y, self.repository.values)
+
+        # Sort the rows by clicking the column headings
+        self.heading_sorter = HeadingSorter(self.table_view, self.repository.record_type.fields, self.show_rows)
+        self.show_rows()
+
     
     def on_frame_configure(self, event):
         # Adjust scroll region of the canvas
@@ -95,15 +112,8 @@ class WasteCatFrame(tk.Frame):
         categories_label_method = ttk.Label(data_entry_frame, text="Collection Method:")
         categories_label_method.grid(row=4, column=0, padx=5, pady=5, sticky="w")
 
-        category_options_method = [
-            "Curbside Pickup", "Container-based Collection", "Drop-off Centers",
-            "Roll-off Containers", "Compactor Trucks", "Manual Sorting Stations",
-            "Automated Sorting Systems", "Source Separation", "Specialized Collection",
-            "Mobile Collection Units"
-        ]
-
         self.categories_listbox_method = tk.Listbox(data_entry_frame, selectmode=tk.MULTIPLE, height=5, width=50)
-        for option in category_options_method:
+        for option in COLLECTION_METHODS:
             self.categories_listbox_method.insert(tk.END, option)
 
         self.categories_listbox_method.grid(row=4, column=1, pady=5, sticky="w")
@@ -133,14 +143,8 @@ class WasteCatFrame(tk.Frame):
         categories_label_transportation = ttk.Label(data_entry_frame, text="Transportation Method:")
         categories_label_transportation.grid(row=6, column=0, padx=5, pady=5, sticky="w")
 
-        category_options_transportation = [
-            "Garbage Trucks", "Recycling Trucks", "Roll-off Trucks", "Front-Loaders",
-            "Rear-Loaders", "Side-Loaders", "Transfer Trucks", "Rail Transport",
-            "Barge or Ship Transport", "Pipeline Transport", "Cycling and Pedestrian Transport"
-        ]
-
         self.categories_listbox_transportation = tk.Listbox(data_entry_frame, selectmode=tk.MULTIPLE, height=5, width=50)
-        for option in category_options_transportation:
+        for option in TRANSPORTATION_METHODS:
             self.categories_listbox_transportation.insert(tk.END, option)
 
         self.categories_listbox_transportation.grid(row=6, column=1, pady=5, sticky="w")
@@ -176,11 +180,20 @@ class WasteCatFrame(tk.Frame):
         self.create_button(data_entry_frame, text="Add Data", command=self.add_data, row=10, column=0, pady=10)
         self.create_button(data_entry_frame, text="Clear Input", command=self.clear_input, row=10, column=1, pady=10)
         self.save_button = self.create_button(data_entry_frame, text="Update Data", command=self.save_data, state=tk.DISABLED, row=10, column=2, pady=10)
+        self.create_button(data_entry_frame, text="Batch Add", command=self.batch_add, row=10, column=3, pady=10)
 
         # Section 3: View/Edit Protocol Data
         table_view_frame = ttk.Frame(self.scrollable_frame)
         table_view_frame.grid(row=11, column=0, pady=10, padx=10, sticky="w")  # Updated row parameter
 
+        # Running totals of the loaded records
+        self.summary_label = ttk.Label(table_view_frame, text="")
+        self.summary_label.grid(row=4, column=0, columnspan=3, pady=5, sticky="w")
+
+        # Search bar and category filters above the table
+        self.search_bar = SearchBar(self.scrollable_frame, self.repository.record_type, self.show_rows)
+        self.search_bar.grid(row=7, column=0, padx=10, pady=(10, 0), sticky="w")
+
         # Call create_tree_view to generate the table view
         self.create_tree_view()
 
@@ -188,6 +201,17 @@ class WasteCatFrame(tk.Frame):
         self.create_button(table_view_frame, text="Delete Data", command=self.delete_data, row=2, column=0, pady=10)
         self.create_button(table_view_frame, text="Create .json", command=self.create_json, row=2, column=1, pady=10)
         self.create_button(table_view_frame, text="Open .json", command=self.open_json, row=2, column=2, pady=10)
+        self.create_button(table_view_frame, text="Undo", command=self.undo, row=2, column=3, pady=10)
+        self.create_button(table_view_frame, text="Redo", command=self.redo, row=2, column=4, pady=10)
+
+        # Keyboard shortcuts; every frame binds them and only the visible one reacts
+        self.bind_all("<Control-z>", self.undo, add="+")
+        self.bind_all("<Control-y>", self.redo, add="+")
+
+        # Progress indicator and Cancel button for background loading
+        self.load_progress = ttk.Progressbar(table_view_frame, orient="horizontal", length=200, mode="determinate")
+        self.load_progress.grid(row=3, column=0, columnspan=2, pady=5, sticky="w")
+        self.cancel_load_button = self.create_button(table_view_frame, text="Cancel Loading", command=self.cancel_load, state=tk.DISABLED, row=3, column=2, pady=5)
 
     def create_section_label(self, text, font_size, row=None):
         label = ttk.Label(self.scrollable_frame, text=text, font=("Calibri", font_size, "bold"))
@@ -233,79 +257,19 @@ class WasteCatFrame(tk.Frame):
             self.stored_categories_listbox_transportation.delete(index)
 
     def add_data(self):
-        # Get values from input fields
-        city = self.city_entry.get()
-        area = self.area_entry.get()
-        frequency = self.frequency_entry.get()
-
-        # Validate non-empty fields
-        if not city or not area or not frequency:
-            messagebox.showerror("Error", "Please fill in all fields.")
-            return
-
-        # Get selected method categories from the listbox
-        selected_method_categories = self.stored_categories_listbox_method.get(0, tk.END)
-
-        # Validate that at least one method category is selected
-        if not selected_method_categories:
-            messagebox.showerror("Error", "Please select at least one method category.")
+        # Validate the input fields and store them as a new record
+        try:
+            self.repository.add(self.get_input_fields())
+        except ValidationError as e:
+            messagebox.showerror("Error", str(e))
             return
-
-        # Combine selected method categories into a comma-separated string
-        method_categories_str = ", ".join(selected_method_categories)
-
-        # Get selected transportation categories from the listbox
-        selected_transportation_categories = self.stored_categories_listbox_transportation.get(0, tk.END)
-
-        # Validate that at least one transportation category is selected
-        if not selected_transportation_categories:
-            messagebox.showerror("Error", "Please select at least one transportation category.")
+        except STORAGE_ERRORS as e:
+            messagebox.showerror("Error", f"Error saving data: {str(e)}")
             return
+        self.show_rows()
 
-        # Combine selected transportation categories into a comma-separated string
-        transportation_categories_str = ", ".join(selected_transportation_categories)
-
-        # Get notes
-        notes = self.notes_entry.get("1.0", tk.END).strip()  # Use strip to remove leading/trailing whitespace
-
-        # Generate a random ID
-        random_id = self.generate_random_id()
-
-        # Example: Insert data into the Treeview with a random ID
-        self.table_view.insert("", "end", values=(random_id, city, area, frequency, method_categories_str, transportation_categories_str, notes), tags=("multiline",))
-
-        # Pass the file path to add_data_to_json if available
-        file_path = getattr(self, 'json_file_path', None)  # Use the stored file path
-        if file_path:
-            # Load the existing data from the JSON file
-            try:
-                with open(file_path, "r") as json_file:
-                    data = json.load(json_file)
-
-                # Add the new data to the list
-                new_data = {
-                    "ID": random_id,
-                    "City": city,
-                    "Area": area,
-                    "Frequency": frequency,
-                    "Method Categories": selected_method_categories,
-                    "Transportation Categories": selected_transportation_categories,
-                    "Notes": notes
-                }
-                data.append(new_data)
-
-                # Save the modified data back to the JSON file
-                with open(file_path, "w") as json_file:
-                    json.dump(data, json_file, indent=4)
-
-            except FileNotFoundError:
-                messagebox.showerror("Error", f"File not found: {file_path}")
-            except json.JSONDecodeError as e:
-                messagebox.showerror("Error", f"Error decoding JSON from {file_path}: {str(e)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
-        else:
-            # If file path is not available, display a message
+        if self.repository.storage is None:
+            # If no file is open, display a message
             messagebox.showinfo("Information", "No file path available. Data added only to the table.")
 
         # Clear input fields
@@ -318,6 +282,54 @@ class WasteCatFrame(tk.Frame):
         # Show success message
         messagebox.showinfo("Success", "Data added successfully.")
 
+    def undo(self, event=None):
+        # Revert the latest add, update or delete made in this frame
+        if self.handles_shortcut(event) and self.repository.undo():
+            self.clear_input()
+            self.show_rows()
+
+    def redo(self, event=None):
+        # Repeat the latest undone edit
+        if self.handles_shortcut(event) and self.repository.redo():
+            self.clear_input()
+            self.show_rows()
+
+    def handles_shortcut(self, event):
+        # Buttons always act; key presses only on the visible frame and outside text fields
+        if event is None:
+            return True
+        return self.winfo_ismapped() and not isinstance(event.widget, (tk.Entry, tk.Text))
+
+    def batch_add(self):
+        # Add many rows from a CSV file or a pasted table in one go
+        BatchAddDialog(self, self.repository, self.on_batch_added)
+
+    def on_batch_added(self, records):
+        # Show the rows added by the batch dialog
+        self.show_rows()
+
+    def show_rows(self, keep_position=True):
+        """
+        Show the records matching the search bar in the table, in the
+        order picked with the column headings.
+        """
+        text, facets = self.search_bar.query()
+        self.virtual_table.set_rows(self.repository.find(text, facets, self.heading_sorter.order), keep_position)
+        self.summary_label.config(text=self.repository.aggregates.summary())
+
+    def get_input_fields(self):
+        """
+        Return the values of the input fields, keyed by record field.
+        """
+        return {
+            "City": self.city_entry.get(),
+            "Area": self.area_entry.get(),
+            "Frequency": self.frequency_entry.get(),
+            "Method": self.stored_categories_listbox_method.get(0, tk.END),
+            "Transportation": self.stored_categories_listbox_transportation.get(0, tk.END),
+            "Notes": self.notes_entry.get("1.0", tk.END).strip()  # Use strip to remove leading/trailing whitespace
+        }
+
     def get_next_row(self):
         return len(self.scrollable_frame.grid_slaves()) + 1
 
@@ -338,85 +350,27 @@ class WasteCatFrame(tk.Frame):
         selected_item = self.table_view.selection()
 
         if selected_item:
-            # Get values from input fields
-            city = self.city_entry.get()
-            area = self.area_entry.get()
-            frequency = self.frequency_entry.get()
-
-            # Validate non-empty fields
-            if not city or not area or not frequency:
-                messagebox.showerror("Error", "Please fill in all fields.")
+            # Validate the input fields and update the record by its ID
+            selected_item_id = self.table_view.item(selected_item, 'values')[0]
+            try:
+                self.repository.update(selected_item_id, self.get_input_fields())
+            except ValidationError as e:
+                messagebox.showerror("Error", str(e))
                 return
-
-            # Get selected method categories from the listbox
-            selected_method_categories = self.stored_categories_listbox_method.get(0, tk.END)
-
-            # Validate that at least one method category is selected
-            if not selected_method_categories:
-                messagebox.showerror("Error", "Please select at least one method category.")
+            except STORAGE_ERRORS as e:
+                messagebox.showerror("Error", f"Error saving data: {str(e)}")
                 return
 
-            # Combine selected method categories into a comma-separated string
-            method_categories_str = ", ".join(selected_method_categories)
-
-            # Get selected transportation categories from the listbox
-            selected_transportation_categories = self.stored_categories_listbox_transportation.get(0, tk.END)
+            # The edit can move the record in the sort order, the filters and the totals
+            self.show_rows()
 
-            # Validate that at least one transportation category is selected
-            if not selected_transportation_categories:
-                messagebox.showerror("Error", "Please select at least one transportation category.")
-                return
-
-            # Combine selected transportation categories into a comma-separated string
-            transportation_categories_str = ", ".join(selected_transportation_categories)
-
-            # Get notes
-            notes = self.notes_entry.get("1.0", tk.END).strip()  # Use strip to remove leading/trailing whitespace
-
-            # Update the Treeview with edited values
-            current_values = self.table_view.item(selected_item, 'values')
-            updated_values = (
-                current_values[0],  # ID
-                city,
-                area,
-                frequency,
-                method_categories_str,
-                transportation_categories_str,
-                notes
-            )
-            self.table_view.item(selected_item, values=updated_values)
-
-            # Update the corresponding data in the JSON file
-            file_path = getattr(self, 'json_file_path', None)
-            if file_path:
-                try:
-                    with open(file_path, "r") as json_file:
-                        data = json.load(json_file)
-
-                    # Find and update the selected item data in the list
-                    selected_item_id = current_values[0]
-                    for item in data:
-                        if str(item.get("ID")) == selected_item_id:
-                            item.update({
-                                "City": city,
-                                "Area": area,
-                                "Frequency": frequency,
-                                "Method": selected_method_categories,
-                                "Transportation": selected_transportation_categories,
-                                "Notes": notes
-                            })
-
-                    # Save the modified data back to the JSON file
-                    with open(file_path, "w") as json_file:
-                        json.dump(data, json_file, indent=4)
-
-                    # Show success message
-                    messagebox.showinfo("Success", "Data saved successfully.")
-                except Exception as e:
-                    messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
-            else:
+            if self.repository.storage is None:
+                # If no file is open, display a message
                 messagebox.showinfo("Information", "No file path available. Data saved only to the table.")
 
+            # Show success message
+            messagebox.showinfo("Success", "Data saved successfully.")
+
             # Clear input fields
             self.clear_input()
         else:
@@ -430,35 +384,17 @@ class WasteCatFrame(tk.Frame):
             confirm_delete = messagebox.askokcancel("Confirm Deletion", "Are you sure you want to delete the selected waste data?")
 
             if confirm_delete:
-                # Pass the file path to delete_data_from_json if available
-                file_path = getattr(self, 'json_file_path', None)  # Use the stored file path
-
-                # User confirmed, proceed with deletion
-                values = self.table_view.item(selected_item, 'values')
-                self.table_view.delete(selected_item)
-
-                if file_path:
-                    # Load the existing data from the JSON file
-                    try:
-                        with open(file_path, "r") as json_file:
-                            data = json.load(json_file)
-
-                        # Find and remove the selected item data from the list
-                        selected_item_id = values[0]  # Assuming ID is the first column
-                        data = [item for item in data if str(item.get("ID")) != selected_item_id]
-
-                        # Save the modified data back to the JSON file
-                        with open(file_path, "w") as json_file:
-                            json.dump(data, json_file, indent=4)
-
-                    except FileNotFoundError:
-                        messagebox.showerror("Error", f"File not found: {file_path}")
-                    except json.JSONDecodeError as e:
-                        messagebox.showerror("Error", f"Error decoding JSON from {file_path}: {str(e)}")
-                    except Exception as e:
-                        messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
-                else:
-                    # If file path is not available, display a message
+                # User confirmed, remove the record by its ID
+                selected_item_id = self.table_view.item(selected_item, 'values')[0]  # Assuming ID is the first column
+                try:
+                    self.repository.delete(selected_item_id)
+                except STORAGE_ERRORS as e:
+                    messagebox.showerror("Error", f"Error deleting data: {str(e)}")
+                    return
+                self.show_rows()
+
+                if self.repository.storage is None:
+                    # If no file is open, display a message
                     messagebox.showinfo("Information", "No file path available. Data deleted only from the table.")
 
                 # Show success message
@@ -468,91 +404,112 @@ class WasteCatFrame(tk.Frame):
 
 
     def create_json(self):
-        # Get data from the Treeview
-        data_to_save = []
-
-        # Iterate through the items in the Treeview
-        for item_id in self.table_view.get_children():
-            values = self.table_view.item(item_id, option='values')  # Use option keyword
-
-            # Extract values from the Treeview item
-            row_data = {
-                "ID": values[0],  # Assuming ID is the first column in the Treeview
-                "City": values[1],
-                "Area": values[2],
-                "Frequency": values[3],
-                "Method": values[4].split(", "),  # Assuming Method is the fifth column
-                "Transportation": values[5].split(", "),  # Assuming Transportation is the sixth column
-                "Notes": values[6]
-            }
-
-            # Append the row data to the list
-            data_to_save.append(row_data)
-
         # Specify the path for saving the JSON file
-        save_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        save_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("Snapshot files", "*.sdgs"), ("SQLite databases", "*.db *.sqlite *.sqlite3")])
 
         if save_path:
-            # Save the data to the JSON file
-            with open(save_path, "w") as json_file:
-                json.dump(data_to_save, json_file, indent=4)
+            # Save the records as JSON, a snapshot or a SQLite table
+            self.repository.export(save_path)
 
             # Show success message
             messagebox.showinfo("Success", "JSON file created successfully.")
 
     def open_json(self):
         # Prompt the user to select a JSON file
-        file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("Snapshot files", "*.sdgs"), ("SQLite databases", "*.db *.sqlite *.sqlite3")])
 
         if file_path:
-            try:
-                # Read the JSON file
-                with open(file_path, "r") as json_file:
-                    data = json.load(json_file)
-
-                # Clear existing data in the Treeview
-                self.clear_treeview()
-
-                # Set the file path attribute
-                self.json_file_path = file_path
-
-                # Iterate over the loaded data and insert it into the Treeview
-                for item in data:
-                    # Check if "Method" and "Transportation" are lists before splitting
-                    if isinstance(item.get("Method"), list):
-                        method = ", ".join(item["Method"])
-                    else:
-                        method = item.get("Method", "")
-
-                    if isinstance(item.get("Transportation"), list):
-                        transportation = ", ".join(item["Transportation"])
-                    else:
-                        transportation = item.get("Transportation", "")
-
-                    # Insert data into the Treeview
-                    self.table_view.insert("", "end", values=(
-                        item.get("ID", ""),  # Assuming ID is the first key in the dictionary
-                        item.get("City", ""),
-                        item.get("Area", ""),
-                        item.get("Frequency", ""),
-                        method,
-                        transportation,
-                        item.get("Notes", "")
-                    ))
-
-                # Show success message
-                messagebox.showinfo("Success", f"Data loaded from {file_path}.")
+            # Stop a load that is still running
+            self.cancel_load()
 
+            try:
+                # Switch the repository to the new file; records are added batch by batch
+                self.repository.open(file_path)
             except Exception as e:
-                # Display an error message if there's an issue with reading the file
+                # E.g. a .db file that is not a SQLite database, or a damaged snapshot
+                self.unload_file()
                 messagebox.showerror("Error", f"Error loading data from {file_path}: {str(e)}")
+                return
+            self.show_rows(keep_position=False)
+
+            # Stream the records from the storage backend on a worker thread
+            storage = self.repository.storage
+            self.loader = BackgroundLoader(self, storage.iter_records, self.on_load_batch, self.on_load_done,
+                                           self.on_load_error, progress=storage.progress)
+            self.load_progress.config(mode="indeterminate")
+            self.load_progress.start()
+            self.cancel_load_button.config(state=tk.NORMAL)
+            self.loader.start()
+
+    def on_load_batch(self, batch):
+        # Index the loaded records by ID and show them as they arrive
+        self.repository.add_loaded(batch)
+        text, facets = self.search_bar.query()
+        if self.heading_sorter.order or facets or text.strip():
+            # Append the matching records only; the rows are sorted once the load is done
+            self.virtual_table.append_rows([str(record.get("ID")) for record in batch
+                                            if self.repository.matches(record, text, facets)])
+            self.summary_label.config(text=self.repository.aggregates.summary())
+        else:
+            self.show_rows()
+
+        # Switch to a determinate progress bar once the progress is known
+        if self.loader.fraction is not None:
+            self.load_progress.stop()
+            self.load_progress.config(mode="determinate", maximum=1.0, value=self.loader.fraction)
+
+    def on_load_done(self):
+        self.finish_load()
+        self.repository.loaded = True
+        self.show_rows()
+
+        # Show success message
+        messagebox.showinfo("Success", f"Data loaded from {self.repository.path}.")
 
-    def clear_treeview(self):
+        # Report records that had no ID or a duplicate one
+        rekeyed = self.repository.rekeyed
+        if rekeyed:
+            examples = ", ".join(f"{old} -> {new}" for old, new in rekeyed[:5])
+            messagebox.showwarning("Duplicate IDs", f"{len(rekeyed)} records had a missing or duplicate ID and "
+                                                    f"were given a new one ({examples}). The new IDs are written "
+                                                    f"to the file when it is saved or closed.")
+
+    def on_load_error(self, e):
+        file_path = self.repository.path
+        self.finish_load()
+        self.unload_file()
+
+        # Display an error message if there's an issue with reading the file
+        messagebox.showerror("Error", f"Error loading data from {file_path}: {str(e)}")
+
+    def cancel_load(self):
+        """
+        Stop a background load that is still running and drop the partial data.
         """
-        Clear all items in the Treeview widget.
+        loader = getattr(self, 'loader', None)
+        if loader and loader.running:
+            loader.cancel()
+            self.finish_load()
+            self.unload_file()
+
+    def finish_load(self):
+        # Reset the progress indicator and Cancel button
+        self.load_progress.stop()
+        self.load_progress.config(mode="determinate", value=0)
+        self.cancel_load_button.config(state=tk.DISABLED)
+
+    def unload_file(self):
+        # Forget the opened file and clear the table
+        self.close_storage()
+        self.repository.clear()
+        self.show_rows(keep_position=False)
+
+    def close_storage(self):
         """
-        for item in self.table_view.get_children():
-            self.table_view.delete(item)
+        Close the storage backend of the currently open file, if any.
+        Pending journal entries are compacted into the file first.
+        """
+        self.repository.close()
 
     def on_table_click(self, event):
         # Retrieve the selected item from the Treeview
@@ -562,33 +519,32 @@ class WasteCatFrame(tk.Frame):
         if selected_item:
             values = self.table_view.item(selected_item, 'values')
 
-            # Retrieve the ID of the selected row
+            # Retrieve the record of the selected row by its ID
             selected_id = values[0]
+            record = self.repository.records.get(selected_id)
 
             # Populate input fields
             self.city_entry.delete(0, tk.END)
-            self.city_entry.insert(0, values[1])  # Assuming City is the second column
+            self.city_entry.insert(0, record.get("City", ""))
 
             self.area_entry.delete(0, tk.END)
-            self.area_entry.insert(0, values[2])  # Assuming Area is the third column
+            self.area_entry.insert(0, record.get("Area", ""))
 
             self.frequency_entry.delete(0, tk.END)
-            self.frequency_entry.insert(0, values[3])  # Assuming Frequency is the fourth column
+            self.frequency_entry.insert(0, record.get("Frequency", ""))
 
             # Clear and insert categories into the stored_categories_listbox_method
             self.stored_categories_listbox_method.delete(0, tk.END)
-            categories_method = values[4].split(", ")  # Assuming Method is the fifth column
-            for category in categories_method:
+            for category in record.get("Method") or []:
                 self.stored_categories_listbox_method.insert(tk.END, category)
 
             # Clear and insert categories into the stored_categories_listbox_transportation
             self.stored_categories_listbox_transportation.delete(0, tk.END)
-            categories_transportation = values[5].split(", ")  # Assuming Transportation is the sixth column
-            for category in categories_transportation:
+            for category in record.get("Transportation") or []:
                 self.stored_categories_listbox_transportation.insert(tk.END, category)
 
             self.notes_entry.delete("1.0", tk.END)
-            self.notes_entry.insert(tk.END, values[6])  # Assuming Notes is the eighth column
+            self.notes_entry.insert(tk.END, record.get("Notes", ""))
 
             # Enable Save button
             self.save_button.config(state=tk.NORMAL)
@@ -597,13 +553,6 @@ class WasteCatFrame(tk.Frame):
             # If no item is selected, disable the Save button
             self.save_button.config(state=tk.DISABLED)
 
-    def generate_random_id(self):
-        """
-        Generate a random ID.
-        """
-        random_id = str(uuid.uuid4().hex)[:8]  # Extract the first 8 characters of the UUID
-        return random_id
-
 if __name__ == "__main__":
     root = tk.Tk()
     root.geometry('800x600')
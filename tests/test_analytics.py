@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from src.data import analytics
+from src.data.analytics import ColumnTable
+from src.data.schema import WASTE_CATEGORIES, WASTE_PROFILES
+from src.data.snapshot import write_snapshot
+from src.main import main
+
+CITIES = ("Manila", "Pasig", "Taguig", "Makati")
+
+
+def waste_profiles(count, seed=7):
+    rng = random.Random(seed)
+    records = []
+    for number in range(count):
+        quantity = rng.choice([f"{rng.uniform(0, 100):.2f}", str(rng.randint(0, 50)), "n/a"])
+        categories = sorted(rng.sample(range(len(WASTE_CATEGORIES)), rng.randint(0, 3)))
+        records.append({"ID": f"r{number}", "City": rng.choice(CITIES),
+                        "Category": [WASTE_CATEGORIES[code] for code in categories],
+                        "Quantity": quantity, "Notes": ""})
+    # Kept as JSON in a snapshot: the padded number would not survive a float
+    records.append({"ID": "overflow", "City": "Quezon City", "Category": ["Glass Waste", "Recyclables"],
+                    "Quantity": "7.50", "Notes": ""})
+    return records
+
+
+def python_sums(records, field):
+    totals = {}
+    for record in records:
+        try:
+            amount = float(record["Quantity"])
+        except ValueError:
+            amount = 0.0
+        values = record[field] if isinstance(record[field], list) else [record[field]]
+        for value in values:
+            totals[value] = totals.get(value, 0.0) + amount
+    return totals
+
+
+@unittest.skipIf(analytics.np is None, "NumPy is not installed")
+class ColumnTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.records = waste_profiles(500)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_sums_match(self, table):
+        for field in ("City", "Category"):
+            sums = table.group_sums(field)
+            expected = python_sums(self.records, field)
+            self.assertEqual(set(sums), set(expected))
+            for value, total in expected.items():
+                self.assertAlmostEqual(sums[value], total, places=6)
+
+    def test_group_sums_match_a_plain_python_sum(self):
+        self.assert_sums_match(ColumnTable.from_records(self.records, WASTE_PROFILES))
+
+    def test_snapshot_columns_give_the_same_sums(self):
+        path = os.path.join(self.directory, "waste.sdgs")
+        write_snapshot(path, self.records, WASTE_PROFILES)
+        self.assert_sums_match(ColumnTable.from_file(path, WASTE_PROFILES))
+
+    def test_cli_prints_the_totals(self):
+        path = os.path.join(self.directory, "waste.sdgs")
+        write_snapshot(path, self.records, WASTE_PROFILES)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["analytics", "waste_profiles", path, "--by", "City"])
+        self.assertEqual(status, 0)
+        self.assertIn("  Quezon City: 7.50", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
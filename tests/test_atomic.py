@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.atomic import atomic_write, backup_path
+
+
+class AtomicWriteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, text, backups=2):
+        with atomic_write(self.path, backups=backups) as target:
+            target.write(text)
+
+    def read(self, path):
+        with open(path) as source:
+            return source.read()
+
+    def test_backups_rotate_and_keep_at_most_the_limit(self):
+        for version in ("one", "two", "three", "four"):
+            self.write(version)
+        self.assertEqual(self.read(self.path), "four")
+        self.assertEqual(self.read(backup_path(self.path, 1)), "three")
+        self.assertEqual(self.read(backup_path(self.path, 2)), "two")
+        self.assertFalse(os.path.exists(backup_path(self.path, 3)))
+
+    def test_failed_write_leaves_the_target_and_backups_alone(self):
+        self.write("one")
+        self.write("two")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path, backups=2) as target:
+                target.write("half of three")
+                raise RuntimeError("crash")
+        self.assertEqual(self.read(self.path), "two")
+        self.assertEqual(self.read(backup_path(self.path, 1)), "one")
+        self.assertEqual(sorted(os.listdir(self.directory)), ["waste.json", "waste.json.1.bak"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from src.data.autosave import AutosaveStore
+
+
+class RecordingStorage:
+    """
+    Backend that records the calls it receives, failing on demand.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.closed = False
+
+    def add_many(self, records):
+        self._call("add_many", [record["ID"] for record in records])
+
+    def update(self, record_id, fields):
+        self._call("update", record_id)
+
+    def delete(self, record_id):
+        self._call("delete", record_id)
+
+    def close(self):
+        self.closed = True
+
+    def _call(self, *call):
+        if self.fail:
+            raise OSError("disk full")
+        self.calls.append(call)
+
+
+class AutosaveTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = RecordingStorage()
+        # Long enough that only explicit flushes write during a test
+        self.store = AutosaveStore(self.storage, delay=60, max_edits=1000)
+
+    def tearDown(self):
+        self.store._cancel_timer()
+
+    def test_runs_of_adds_are_coalesced_in_order(self):
+        self.store.add({"ID": "a"})
+        self.store.add_many([{"ID": "b"}, {"ID": "c"}])
+        self.store.update("a", {"City": "Pasig"})
+        self.store.add({"ID": "d"})
+        self.store.delete("b")
+        self.assertTrue(self.store.dirty)
+        self.assertEqual(self.storage.calls, [])
+
+        self.store.flush()
+        self.assertFalse(self.store.dirty)
+        self.assertEqual(self.storage.calls, [
+            ("add_many", ["a", "b", "c"]), ("update", "a"), ("add_many", ["d"]), ("delete", "b"),
+        ])
+
+    def test_close_writes_pending_edits_first(self):
+        self.store.add({"ID": "a"})
+        self.store.close()
+        self.assertEqual(self.storage.calls, [("add_many", ["a"])])
+        self.assertTrue(self.storage.closed)
+
+    def test_failed_write_keeps_the_edits_and_the_error(self):
+        self.store.add({"ID": "a"})
+        self.store.delete("a")
+        self.storage.fail = True
+        with self.assertRaises(OSError):
+            self.store.flush()
+        self.assertIsInstance(self.store.error, OSError)
+        self.assertTrue(self.store.dirty)
+
+        self.storage.fail = False
+        self.store.flush()
+        self.assertIsNone(self.store.error)
+        self.assertEqual(self.storage.calls, [("add_many", ["a"]), ("delete", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from src.data.ids import ALPHABET, IdGenerator
+
+
+class IdGeneratorTestCase(unittest.TestCase):
+
+    def test_ids_within_one_millisecond_are_unique_and_increasing(self):
+        generator = IdGenerator(clock=lambda: 1700000000000 * 1000000)
+        ids = [generator.generate() for _ in range(10000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(len(record_id) == 16 and set(record_id) <= set(ALPHABET) for record_id in ids))
+
+    def test_ids_keep_increasing_when_the_clock_steps_back(self):
+        times = iter([5000, 5000, 4000, 4000, 6000])
+        generator = IdGenerator(clock=lambda: next(times) * 1000000)
+        ids = [generator.generate() for _ in range(5)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+
+    def test_ids_sort_by_creation_time(self):
+        times = iter([1000, 2000])
+        generator = IdGenerator(clock=lambda: next(times) * 1000000)
+        first, second = generator.generate(), generator.generate()
+        self.assertLess(first[:10], second[:10])
+
+
+if __name__ == "__main__":
+    unittest.main()
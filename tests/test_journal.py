@@ -0,0 +1,169 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.data.journal import JournalStore
+from src.data.repositories import ProtocolRepository, WasteProfileRepository
+
+
+def waste_profile(record_id, city="Manila", quantity="1.5"):
+    return {"ID": record_id, "City": city, "Category": ["Recyclables"], "Quantity": quantity, "Notes": "Collected."}
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.json")
+        with open(self.path, "w") as json_file:
+            json.dump([waste_profile("a"), waste_profile("b")], json_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_base(self):
+        with open(self.path) as json_file:
+            return json.load(json_file)
+
+    def test_save_over_opened_file_folds_in_the_journal(self):
+        repository = WasteProfileRepository()
+        repository.load(self.path)
+        added = repository.add({"City": "Pasig", "Category": ["Organic Waste"], "Quantity": "2", "Notes": "New."})
+        repository.update("a", {"City": "Taguig", "Category": ["Recyclables"], "Quantity": "3", "Notes": "Moved."})
+        repository.export(self.path)
+
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "b", added["ID"]])
+        repository.close()
+
+        reopened = WasteProfileRepository()
+        reopened.load(self.path)
+        self.assertEqual(reopened.records.ids(), ["a", "b", added["ID"]])
+        self.assertEqual(reopened.records.get("a")["City"], "Taguig")
+        reopened.close()
+
+    def test_replaying_an_already_compacted_journal_is_harmless(self):
+        # A crash after the compacted base replaced the old one, before the
+        # rotated journal was removed
+        store = JournalStore(self.path)
+        store.add(waste_profile("c"))
+        store.update("a", {"City": "Taguig"})
+        store.delete("b")
+        store.compact(wait=True)
+        with open(store.compacting_path, "w") as journal_file:
+            journal_file.write("\n".join(json.dumps(entry) for entry in [
+                {"op": "add", "record": waste_profile("c")},
+                {"op": "update", "id": "a", "fields": {"City": "Taguig"}},
+                {"op": "delete", "id": "b"},
+            ]) + "\n")
+
+        store = JournalStore(self.path)
+        records = store.load()
+        self.assertEqual([record["ID"] for record in records], ["a", "c"])
+        self.assertEqual(records[0]["City"], "Taguig")
+
+        repository = WasteProfileRepository()
+        repository.load(self.path)
+        self.assertEqual(repository.records.ids(), ["a", "c"])
+        repository.close()
+        self.assertFalse(os.path.exists(store.compacting_path))
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "c"])
+
+    def test_add_after_delete_replaces_the_base_record(self):
+        store = JournalStore(self.path)
+        store.delete("a")
+        store.add(waste_profile("a", city="Pasig"))
+        store.compact(wait=True)
+        self.assertEqual([(record["ID"], record["City"]) for record in self.read_base()],
+                         [("a", "Pasig"), ("b", "Manila")])
+
+    def test_duplicate_and_missing_ids_get_stable_new_ids(self):
+        missing = waste_profile("")
+        del missing["ID"]
+        with open(self.path, "w") as json_file:
+            json.dump([waste_profile("a"), waste_profile("a", city="Pasig"), missing], json_file)
+
+        repository = WasteProfileRepository()
+        repository.load(self.path)
+        self.assertEqual(repository.records.ids(), ["a", "a-2", "row-3"])
+        self.assertEqual(repository.rekeyed, [("a", "a-2"), (None, "row-3")])
+        fields = waste_profile("a-2", city="Taguig")
+        del fields["ID"]
+        repository.update("a-2", fields)
+        repository.close()
+
+        reopened = WasteProfileRepository()
+        reopened.load(self.path)
+        self.assertEqual(reopened.rekeyed, [])
+        self.assertEqual([(record["ID"], record["City"]) for record in self.read_base()],
+                         [("a", "Manila"), ("a-2", "Taguig"), ("row-3", "Manila")])
+        reopened.close()
+
+    def test_rekeyed_ids_are_written_on_save_without_edits(self):
+        with open(self.path, "w") as json_file:
+            json.dump([waste_profile("a"), waste_profile("a")], json_file)
+
+        repository = WasteProfileRepository()
+        repository.load(self.path)
+        repository.export(self.path)
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "a-2"])
+        repository.close()
+
+    def test_compaction_reports_the_ids_it_writes(self):
+        with open(self.path, "w") as json_file:
+            json.dump([waste_profile("a"), waste_profile("a")], json_file)
+
+        store = JournalStore(self.path)
+        store.add(waste_profile("b"))
+        store.close()
+        self.assertEqual(store.rekeyed, [("a", "a-2")])
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "a-2", "b"])
+
+    def test_close_folds_edits_made_during_a_compaction(self):
+        store = JournalStore(self.path)
+        store.add(waste_profile("c"))
+        store.compact()
+        store.add(waste_profile("d"))
+        store.close()
+        self.assertFalse(os.path.exists(store.journal_path))
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "b", "c", "d"])
+
+    def test_failed_compaction_is_raised_on_close(self):
+        store = JournalStore(self.path)
+        store.add(waste_profile("c"))
+        with mock.patch("src.data.journal.write_json_array", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.close()
+        self.assertIsInstance(store.error, OSError)
+        self.assertTrue(os.path.exists(store.compacting_path))
+
+        store.close()
+        self.assertIsNone(store.error)
+        self.assertEqual([record["ID"] for record in self.read_base()], ["a", "b", "c"])
+
+    def test_updating_a_legacy_record_writes_schema_keys_only(self):
+        with open(self.path, "w") as json_file:
+            json.dump([{"ID": "p", "City": "Manila", "Area": "10", "Frequency": "Weekly",
+                        "Method Categories": ["Curbside Pickup"], "Transportation Categories": ["Garbage Trucks"],
+                        "Notes": ""}], json_file)
+
+        repository = ProtocolRepository()
+        repository.load(self.path)
+        repository.update("p", {"City": "Manila", "Area": "10", "Frequency": "Weekly", "Method": ["Compactor Trucks"],
+                                "Transportation": ["Garbage Trucks"], "Notes": ""})
+        exported = os.path.join(self.directory, "exported.json")
+        repository.export(exported)
+        repository.close()
+
+        compacted = self.read_base()
+        self.assertEqual(list(compacted[0]), ["ID", "City", "Area", "Frequency", "Method", "Transportation", "Notes"])
+        self.assertEqual(compacted[0]["Method"], ["Compactor Trucks"])
+        with open(exported) as json_file:
+            self.assertEqual(json.load(json_file), compacted)
+
+
+if __name__ == "__main__":
+    unittest.main()
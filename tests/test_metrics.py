@@ -0,0 +1,37 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data import metrics
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        metrics.registry.enabled = False
+        metrics.registry.dump_path = None
+        metrics.registry.reset()
+        shutil.rmtree(self.directory)
+
+    def test_enabling_twice_dumps_once_to_the_last_path(self):
+        environment_path = os.path.join(self.directory, "environment.json")
+        option_path = os.path.join(self.directory, "option.json")
+        metrics.enable(environment_path)
+        metrics.enable(option_path)
+        with metrics.span("work"):
+            metrics.count(rows=3)
+
+        metrics._dump_on_exit()
+        self.assertFalse(os.path.exists(environment_path))
+        with open(option_path) as metrics_file:
+            self.assertEqual(json.load(metrics_file)["work"]["rows"], 3)
+        self.assertTrue(os.path.exists(option_path + metrics.FOLDED_SUFFIX))
+
+
+if __name__ == "__main__":
+    unittest.main()
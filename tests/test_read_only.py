@@ -0,0 +1,69 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.journal import JournalStore
+from src.data.sqlite_store import SQLiteStore
+from src.data.schema import WASTE_PROFILES
+from src.main import main
+
+
+def waste_profile(record_id, city="Manila"):
+    return {"ID": record_id, "City": city, "Category": ["Recyclables"], "Quantity": "1", "Notes": "Collected."}
+
+
+class ReadOnlyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.json")
+        with open(self.path, "w") as json_file:
+            json.dump([waste_profile("a"), waste_profile("a", city="Pasig")], json_file)
+        with open(self.path) as json_file:
+            self.content = json_file.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, *args):
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(errors):
+            status = main(list(args))
+        return status, errors.getvalue()
+
+    def test_validate_reports_duplicates_without_rewriting_the_file(self):
+        status, errors = self.run_cli("validate", "waste_profiles", self.path)
+        self.assertEqual(status, 1)
+        self.assertIn("record 2: Duplicate ID: a.", errors)
+        with open(self.path) as json_file:
+            self.assertEqual(json_file.read(), self.content)
+
+    def test_reading_leaves_the_journal_alone(self):
+        JournalStore(self.path).add(waste_profile("b"))
+        exported = os.path.join(self.directory, "exported.jsonl")
+        self.run_cli("export", "waste_profiles", self.path, exported)
+        self.run_cli("report", "waste_profiles", self.path)
+
+        self.assertTrue(os.path.exists(self.path + ".journal"))
+        with open(self.path) as json_file:
+            self.assertEqual(json_file.read(), self.content)
+        with open(exported) as rows_file:
+            self.assertEqual([json.loads(line)["ID"] for line in rows_file], ["a", "a", "b"])
+
+    def test_read_only_stores_refuse_edits(self):
+        with self.assertRaises(ValueError):
+            JournalStore(self.path, read_only=True).add(waste_profile("b"))
+
+        database = os.path.join(self.directory, "waste.db")
+        SQLiteStore(database, WASTE_PROFILES).close()
+        store = SQLiteStore(database, WASTE_PROFILES, read_only=True)
+        self.assertEqual(list(store.iter_records()), [])
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
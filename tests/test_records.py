@@ -0,0 +1,24 @@
+import unittest
+
+from src.data.records import Facility, Record, WasteProfile
+
+
+class RecordTestCase(unittest.TestCase):
+
+    def test_keys_in_any_order_make_a_compact_record(self):
+        record = WasteProfile.from_dict({"Notes": "Collected.", "Quantity": "1", "Category": ["Recyclables"],
+                                         "City": "Manila", "ID": "a"})
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record.to_dict(), {"ID": "a", "City": "Manila", "Category": ["Recyclables"],
+                                            "Quantity": "1", "Notes": "Collected."})
+
+    def test_only_fields_with_options_are_interned(self):
+        WasteProfile.from_dict({"ID": "a", "City": "Nowhere In Particular"})
+        facility = Facility.from_dict({"ID": "f", "Operating Hours": "9-5", "Facility Type": "Landfills"})
+        self.assertEqual(set(WasteProfile._codes), {"Category"})
+        self.assertEqual(set(Facility._codes), {"Facility Type", "Disposal Methods"})
+        self.assertEqual(facility["Facility Type"], "Landfills")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.reports import aggregate, load_aggregates, save_aggregates
+from src.data.schema import PROTOCOLS, WASTE_PROFILES
+
+RECORDS = [
+    {"ID": "a", "City": "Manila", "Category": ["Recyclables"], "Quantity": "1.5", "Notes": ""},
+    {"ID": "b", "City": "Pasig", "Category": ["Organic Waste"], "Quantity": "2", "Notes": ""},
+]
+
+
+class SavedAggregatesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.json")
+        with open(self.path, "w") as json_file:
+            json.dump(RECORDS, json_file)
+        save_aggregates(self.path, aggregate(RECORDS, WASTE_PROFILES))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_totals_of_an_unchanged_file_are_reused(self):
+        saved = load_aggregates(self.path, WASTE_PROFILES)
+        self.assertIsNotNone(saved)
+        self.assertEqual(saved.to_dict(), aggregate(RECORDS, WASTE_PROFILES).to_dict())
+
+    def test_rewriting_the_file_invalidates_the_totals(self):
+        stat = os.stat(self.path)
+        with open(self.path, "w") as json_file:
+            json.dump(RECORDS[:1], json_file)
+        # Same modification time, different size
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(load_aggregates(self.path, WASTE_PROFILES))
+
+    def test_touching_the_file_invalidates_the_totals(self):
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertIsNone(load_aggregates(self.path, WASTE_PROFILES))
+
+    def test_a_pending_journal_invalidates_the_totals(self):
+        with open(self.path + ".journal", "w") as journal_file:
+            journal_file.write(json.dumps({"op": "delete", "id": "a"}) + "\n")
+        self.assertIsNone(load_aggregates(self.path, WASTE_PROFILES))
+
+    def test_totals_of_another_record_type_are_ignored(self):
+        self.assertIsNone(load_aggregates(self.path, PROTOCOLS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from src.data.schema import COLLECTION_METHODS, PROTOCOLS, TRANSPORTATION_METHODS
+from src.data.search_index import SearchIndex
+
+CITIES = ("Manila", "Quezon City", "Pasig", "Taguig", "Makati")
+NOTES = ("Collected on schedule.", "Needs additional bins.", "Quarterly review.", "")
+
+QUERIES = [
+    ("", {}),
+    ("man", {}),
+    ("collected sched", {}),
+    ("", {"Method": {"Curbside Pickup"}}),
+    ("", {"Method": {"Curbside Pickup", "Compactor Trucks"}, "Transportation": {"Rail Transport"}}),
+    ("qu", {"Transportation": {"Garbage Trucks"}}),
+]
+
+
+def protocols(count, seed=11):
+    rng = random.Random(seed)
+    for number in range(count):
+        yield {
+            "ID": f"p{number}",
+            "City": rng.choice(CITIES),
+            "Area": str(rng.randint(1, 500)),
+            "Frequency": rng.choice(("Daily", "Weekly")),
+            "Method": sorted(rng.sample(COLLECTION_METHODS, rng.randint(0, 2)), key=COLLECTION_METHODS.index),
+            "Transportation": sorted(rng.sample(TRANSPORTATION_METHODS, rng.randint(1, 3)),
+                                     key=TRANSPORTATION_METHODS.index),
+            "Notes": rng.choice(NOTES),
+        }
+
+
+class SearchIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.records = list(protocols(500))
+        self.index = SearchIndex(PROTOCOLS)
+        for record in self.records:
+            self.index.add(record)
+
+    def test_single_record_matches_agree_with_bitmaps(self):
+        for text, facets in QUERIES:
+            bitmap = self.index.match(text, facets)
+            expected = [record["ID"] for record in self.records] if bitmap is None else self.index.ids(bitmap)
+            actual = [record["ID"] for record in self.records if self.index.matches(record, text, facets)]
+            self.assertEqual(actual, expected, (text, facets))
+
+
+if __name__ == "__main__":
+    unittest.main()
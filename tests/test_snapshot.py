@@ -0,0 +1,44 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.schema import WASTE_PROFILES
+from src.data.snapshot import Snapshot, write_snapshot
+
+RECORDS = [
+    {"ID": "a", "City": "Manila", "Category": ["Recyclables", "Organic Waste"], "Quantity": "1.5", "Notes": "Fine."},
+    {"ID": "b", "City": "Pasig", "Category": ["Organic Waste", "Recyclables"], "Quantity": 2, "Notes": ""},
+    {"ID": "c", "City": "Taguig", "Category": [], "Quantity": 2.25, "Notes": "Float."},
+    # Overflow rows, kept as JSON: text that would not survive a float, an extra key, keys out of order
+    {"ID": "d", "City": "Manila", "Category": ["Recyclables"], "Quantity": "1.50", "Notes": "Padded."},
+    {"ID": "e", "City": "Manila", "Category": ["Glass Waste"], "Quantity": "3", "Notes": "", "Truck": "T-1"},
+    {"City": "Makati", "ID": "f", "Category": ["Unknown Thing"], "Quantity": "abc", "Notes": "Odd."},
+]
+
+
+class SnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.sdgs")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip_gives_back_the_same_json(self):
+        self.assertEqual(write_snapshot(self.path, RECORDS, WASTE_PROFILES), len(RECORDS))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.overflow_rows(), [3, 4, 5])
+            records = list(snapshot)
+        self.assertEqual(json.dumps(records), json.dumps(RECORDS))
+
+    def test_single_records_decode_like_the_whole_file(self):
+        write_snapshot(self.path, RECORDS, WASTE_PROFILES)
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual([snapshot.record(row) for row in range(len(snapshot))], RECORDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
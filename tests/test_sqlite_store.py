@@ -0,0 +1,32 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.schema import PROTOCOLS
+from src.data.sqlite_store import SQLiteStore
+
+
+class SQLiteStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SQLiteStore(os.path.join(self.directory, "data.db"), PROTOCOLS)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_updating_a_legacy_record_writes_schema_keys_only(self):
+        self.store.add({"ID": "p", "City": "Manila", "Area": "10", "Frequency": "Weekly",
+                        "Method Categories": ["Curbside Pickup"], "Transportation Categories": ["Garbage Trucks"],
+                        "Notes": ""})
+        self.store.update("p", {"Method": ["Compactor Trucks"]})
+
+        [record] = self.store.iter_records()
+        self.assertEqual(list(record), ["ID", "City", "Area", "Frequency", "Method", "Transportation", "Notes"])
+        self.assertEqual(record["Method"], ["Compactor Trucks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.repositories import WasteProfileRepository
+
+
+def fields(city, quantity="1"):
+    return {"City": city, "Category": ["Recyclables"], "Quantity": quantity, "Notes": "Collected."}
+
+
+class UndoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "waste.json")
+        with open(self.path, "w") as json_file:
+            json.dump([dict(fields(city), ID=city.lower()) for city in ("Manila", "Pasig", "Taguig")], json_file)
+        self.repository = WasteProfileRepository()
+        self.repository.load(self.path)
+
+    def tearDown(self):
+        self.repository.close()
+        shutil.rmtree(self.directory)
+
+    def reopened_ids(self):
+        self.repository.close()
+        self.repository = WasteProfileRepository()
+        self.repository.load(self.path)
+        return self.repository.records.ids()
+
+    def test_undo_and_redo_an_add(self):
+        added = self.repository.add(fields("Makati"))
+        self.assertTrue(self.repository.undo())
+        self.assertNotIn(added["ID"], self.repository.records)
+        self.assertTrue(self.repository.redo())
+        self.assertEqual(self.repository.records.get(added["ID"])["City"], "Makati")
+        self.assertEqual(self.reopened_ids(), ["manila", "pasig", "taguig", added["ID"]])
+
+    def test_undo_and_redo_an_update(self):
+        summary = self.repository.aggregates.summary()
+        self.repository.update("manila", fields("Manila", quantity="5"))
+        self.repository.undo()
+        self.assertEqual(self.repository.records.get("manila")["Quantity"], "1")
+        self.assertEqual(self.repository.aggregates.summary(), summary)
+        self.repository.redo()
+        self.assertEqual(self.repository.records.get("manila")["Quantity"], "5")
+        self.reopened_ids()
+        self.assertEqual(self.repository.records.get("manila")["Quantity"], "5")
+
+    def test_undo_and_redo_a_delete(self):
+        self.repository.delete("pasig")
+        self.repository.undo()
+        self.assertEqual(self.repository.records.get("pasig")["City"], "Pasig")
+        self.repository.redo()
+        self.assertNotIn("pasig", self.repository.records)
+        self.assertEqual(self.repository.find("pasig"), [])
+        self.assertFalse(self.repository.redo())
+        self.assertEqual(self.reopened_ids(), ["manila", "taguig"])
+
+    def test_undone_delete_goes_back_to_its_place(self):
+        self.repository.delete("pasig")
+        self.repository.undo()
+        self.assertEqual(self.repository.records.ids(), ["manila", "pasig", "taguig"])
+        self.assertEqual(self.repository.find("collected"), ["manila", "pasig", "taguig"])
+        self.assertEqual(self.reopened_ids(), ["manila", "pasig", "taguig"])
+
+
+if __name__ == "__main__":
+    unittest.main()
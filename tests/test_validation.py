@@ -0,0 +1,89 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data.repositories import FacilityRepository, ValidationError, WasteProfileRepository
+from src.main import main
+
+ROWS = [
+    {"ID": "ok", "City": "Manila", "Category": ["Recyclables"], "Quantity": "1.5", "Notes": "Fine."},
+    {"ID": "text", "City": "Manila", "Category": "Recyclables, Organic Waste", "Quantity": "2", "Notes": "Fine."},
+    {"ID": "legacy", "City": "Manila", "Categories": ["Organic Waste"], "Quantity": "3", "Notes": "Fine."},
+    {"ID": "quantity", "City": "Manila", "Category": ["Recyclables"], "Quantity": "abc", "Notes": "Bad."},
+    {"ID": "category", "City": "Manila", "Category": ["Unknown Thing"], "Quantity": "1", "Notes": "Bad."},
+    {"ID": "ok", "City": "Pasig", "Category": ["Recyclables"], "Quantity": "1", "Notes": "Duplicate."},
+]
+
+
+class ValidationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, "rows.jsonl")
+        with open(self.source, "w") as rows_file:
+            rows_file.write("".join(json.dumps(row) + "\n" for row in ROWS))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, *args):
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(errors):
+            status = main(list(args))
+        return status, errors.getvalue()
+
+    def test_cli_rejects_the_rows_batch_add_rejects(self):
+        status, errors = self.run_cli("validate", "waste_profiles", self.source)
+        self.assertEqual(status, 1)
+        self.assertIn("record 4: Quantity must be a number.", errors)
+        self.assertIn("record 5: Unknown Category: Unknown Thing.", errors)
+        self.assertIn("record 6: Duplicate ID: ok.", errors)
+        self.assertEqual(len(errors.splitlines()), 3)
+
+        records, rejected = WasteProfileRepository().check_rows(ROWS)
+        self.assertEqual([number for number, _ in rejected], [4, 5, 6])
+        self.assertEqual([record["ID"] for record in records], ["ok", "text", "legacy"])
+
+    def test_import_keeps_category_strings_whole(self):
+        target = os.path.join(self.directory, "waste.json")
+        self.run_cli("import", "waste_profiles", self.source, target)
+        with open(target) as json_file:
+            categories = {record["ID"]: record["Category"] for record in json.load(json_file)}
+        self.assertEqual(categories, {
+            "ok": ["Recyclables"],
+            "text": ["Recyclables", "Organic Waste"],
+            "legacy": ["Organic Waste"],
+        })
+
+    def test_form_edits_get_the_same_checks(self):
+        repository = WasteProfileRepository()
+        for row in ROWS[3:5]:
+            with self.assertRaises(ValidationError):
+                repository.add({field: value for field, value in row.items() if field != "ID"})
+        added = repository.add({"City": "Manila", "Category": ("Recyclables",), "Quantity": "1", "Notes": "Fine."})
+        with self.assertRaisesRegex(ValidationError, "Quantity must be a number."):
+            repository.update(added["ID"], {"City": "Manila", "Category": ("Recyclables",), "Quantity": "1 ton",
+                                            "Notes": "Fine."})
+        self.assertEqual(len(repository.records), 1)
+
+        facilities = FacilityRepository()
+        with self.assertRaisesRegex(ValidationError, "Unknown Facility Type"):
+            facilities.add({"Facility Name": "Depot", "Area": "10", "Operating Hours": "24 hours",
+                            "Address": "1 Rizal Street", "Facility Type": "Select Facility Type:",
+                            "Disposal Methods": ("Recycling",), "Notes": ""})
+
+    def test_import_reports_rekeyed_target_ids(self):
+        target = os.path.join(self.directory, "waste.json")
+        with open(target, "w") as json_file:
+            json.dump([ROWS[0], ROWS[0]], json_file)
+        _, errors = self.run_cli("import", "waste_profiles", self.source, target)
+        self.assertIn(f"{target}: 1 records had a missing or duplicate ID and were given a new one (ok -> ok-2).",
+                      errors)
+
+
+if __name__ == "__main__":
+    unittest.main()